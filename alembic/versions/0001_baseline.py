@@ -0,0 +1,129 @@
+"""baseline: schema previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+
+Databases bootstrapped by create_all already have these tables: every
+statement is IF NOT EXISTS, so `alembic upgrade head` adopts them as-is.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "DO $$ BEGIN "
+        "CREATE TYPE expensereportstatus AS ENUM ('draft', 'pending', 'approved', 'rejected'); "
+        "EXCEPTION WHEN duplicate_object THEN NULL; "
+        "END $$;"
+    )
+
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True, if_not_exists=True)
+
+    op.create_table(
+        "expense_reports",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("concerned_person", sa.String(), nullable=False),
+        sa.Column("hierarchical_plant", sa.String(), nullable=False),
+        sa.Column("hierarchical_plant_other", sa.String(), nullable=True),
+        sa.Column("plant_department", sa.String(), nullable=False),
+        sa.Column("date_start", sa.Date(), nullable=False),
+        sa.Column("date_end", sa.Date(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "draft", "pending", "approved", "rejected",
+                name="expensereportstatus",
+                create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("total_amount_eur", sa.Numeric(12, 2), nullable=True),
+        sa.Column("submitted_at", sa.DateTime(), nullable=True),
+        sa.Column("decision_at", sa.DateTime(), nullable=True),
+        sa.Column("decision_comment", sa.Text(), nullable=True),
+        sa.Column("approval_token", sa.String(64), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_expense_reports_approval_token",
+        "expense_reports",
+        ["approval_token"],
+        unique=True,
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "expense_items",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "report_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("expense_reports.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("topic", sa.String(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("currency", sa.String(), nullable=True),
+        sa.Column("amount", sa.Numeric(10, 2), nullable=True),
+        sa.Column("amount_eur", sa.Numeric(10, 2), nullable=True),
+        sa.Column("exchange_rate", sa.Numeric(12, 6), nullable=True),
+        sa.Column("exchange_rate_date", sa.Date(), nullable=True),
+        sa.Column("amount_source", sa.String(), nullable=True),
+        sa.Column("payment_type", sa.String(), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("comment", sa.String(), nullable=True),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "attachments",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "expense_item_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("expense_items.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("content_type", sa.String(), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("ocr_status", sa.String(), nullable=True),
+        sa.Column("ocr_json", sa.JSON(), nullable=True),
+        sa.Column("ocr_error", sa.String(), nullable=True),
+        sa.Column("ocr_text", sa.String(), nullable=True),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table("attachments")
+    op.drop_table("expense_items")
+    op.drop_index("ix_expense_reports_approval_token", table_name="expense_reports")
+    op.drop_table("expense_reports")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
+    op.execute("DROP TYPE IF EXISTS expensereportstatus")
@@ -0,0 +1,88 @@
+"""OCR job queue, OCR dedup hash, LLM cache, FX rates
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+create_all never added columns to existing tables: content_sha256 is
+missing on databases created before it, the new tables may already exist.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "attachments",
+        sa.Column("content_sha256", sa.String(64), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_attachments_content_sha256",
+        "attachments",
+        ["content_sha256"],
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "ocr_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "attachment_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("attachments.id", ondelete="CASCADE"),
+            nullable=False,
+            unique=True,
+        ),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("run_after", sa.DateTime(), nullable=False),
+        sa.Column("locked_by", sa.String(), nullable=True),
+        sa.Column("locked_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        if_not_exists=True,
+    )
+    op.create_index("ix_ocr_jobs_status", "ocr_jobs", ["status"], if_not_exists=True)
+
+    op.create_table(
+        "llm_cache",
+        sa.Column("key", sa.String(64), primary_key=True),
+        sa.Column("model", sa.String(), nullable=False),
+        sa.Column("prompt_version", sa.String(), nullable=False),
+        sa.Column("response", sa.JSON(), nullable=False),
+        sa.Column("hits", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_used_at", sa.DateTime(), nullable=False),
+        if_not_exists=True,
+    )
+    op.create_index("ix_llm_cache_created_at", "llm_cache", ["created_at"], if_not_exists=True)
+    op.create_index("ix_llm_cache_last_used_at", "llm_cache", ["last_used_at"], if_not_exists=True)
+
+    op.create_table(
+        "fx_rates",
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("currency", sa.String(3), primary_key=True),
+        sa.Column("rate", sa.Numeric(18, 8), nullable=False),
+        sa.Column("source", sa.String(), nullable=True),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        if_not_exists=True,
+    )
+
+
+def downgrade():
+    op.drop_table("fx_rates")
+    op.drop_index("ix_llm_cache_last_used_at", table_name="llm_cache")
+    op.drop_index("ix_llm_cache_created_at", table_name="llm_cache")
+    op.drop_table("llm_cache")
+    op.drop_index("ix_ocr_jobs_status", table_name="ocr_jobs")
+    op.drop_table("ocr_jobs")
+    op.drop_index("ix_attachments_content_sha256", table_name="attachments")
+    op.drop_column("attachments", "content_sha256")
@@ -0,0 +1,51 @@
+"""indexes for ownership checks and report listing
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+Built CONCURRENTLY (outside the migration transaction) so live tables
+are not locked against writes while the indexes are created.
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_expense_items_report_id",
+            "expense_items",
+            ["report_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_attachments_expense_item_id",
+            "attachments",
+            ["expense_item_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # list_my_reports: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        op.create_index(
+            "ix_expense_reports_user_id_created_at",
+            "expense_reports",
+            ["user_id", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table in (
+            ("ix_expense_reports_user_id_created_at", "expense_reports"),
+            ("ix_attachments_expense_item_id", "attachments"),
+            ("ix_expense_items_report_id", "expense_items"),
+        ):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -1,7 +1,7 @@
+import hashlib
 import os
 import uuid
 from typing import List
-from app.ocr.ui_summary import build_ui_summary
 import uuid
 from uuid import UUID
 from fastapi import (
@@ -11,27 +11,26 @@ from fastapi import (
     UploadFile,
     File,
     status,
-    BackgroundTasks,
 )
-from sqlalchemy.orm import Session
-from datetime import date
-from app.services.amount_service import resolve_amount
-from app.db.session import get_db, SessionLocal
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, undefer
+from app.db.session import get_db
 from app.api.auth import get_current_user
 from app.core.roles import ROLE_EMPLOYEE
 from app.core.permissions import require_roles
-from app.utils.calculations import recalculate_report_total_eur
 
 from app.models.user import User
 from app.models.expense_item import ExpenseItem
-from app.models.expense_report import ExpenseReport, ExpenseReportStatus
 from app.models.attachment import Attachment
 from app.schemas.attachment import AttachmentResponse
-from app.ocr.service import extract_receipt
+from app.api.guards import attachment_access, item_access
+from app.ocr.jobs import enqueue_ocr_job
+from app.services.ocr_result_service import (
+    apply_ocr_amount,
+    find_cached_result,
+    store_ocr_result,
+)
 
-from datetime import date
-from app.services.amount_service import resolve_amount
-from app.models.expense_item import ExpenseItem
 from fastapi.responses import FileResponse
 from mimetypes import guess_type
 
@@ -40,6 +39,7 @@ from mimetypes import guess_type
 # -------------------------------------------------------------------
 
 UPLOAD_DIR = "uploads"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # IMPORTANT:
@@ -48,105 +48,6 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 router = APIRouter(tags=["attachments"])
 
 
-# -------------------------------------------------------------------
-# INTERNAL GUARD
-# -------------------------------------------------------------------
-
-def get_item_and_report(db: Session, item_id: str, current_user: User) -> ExpenseItem:
-    item = db.query(ExpenseItem).filter_by(id=item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Expense item not found")
-
-    report = db.query(ExpenseReport).filter_by(id=item.report_id).first()
-    if not report:
-        raise HTTPException(status_code=404, detail="Expense report not found")
-
-    # ✅ correct ownership check
-    if report.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    # ✅ correct draft check (Enum)
-    if report.status != ExpenseReportStatus.draft:
-        raise HTTPException(status_code=403, detail="Expense report is locked")
-
-    return item
-
-
-# -------------------------------------------------------------------
-# OCR BACKGROUND TASK (KEEPING YOUR LOGIC)
-# -------------------------------------------------------------------
-def run_ocr_task(attachment_id: str):
-    db: Session = SessionLocal()
-    attachment = None
-
-    try:
-        attachment = db.query(Attachment).filter_by(id=attachment_id).first()
-        if not attachment:
-            return
-
-        attachment.ocr_status = "PROCESSING"
-        attachment.ocr_error = None
-        attachment.ocr_text = None
-        attachment.ocr_json = None
-        db.commit()
-
-        result = extract_receipt(attachment.file_path)
-        if not result or not result.get("ocr_text"):
-            raise RuntimeError("OCR returned empty text")
-
-        # ---- OCR RAW DATA
-        attachment.ocr_text = result["ocr_text"]
-
-        # ---- BUILD UI SUMMARY
-        ui_summary = build_ui_summary(result["ocr_json"])
-
-        # ---- STORE FULL OCR JSON
-        attachment.ocr_json = {
-            **result["ocr_json"],
-            "ui_summary": ui_summary,
-        }
-        attachment.ocr_status = "DONE"
-        db.commit()
-
-        # ---- APPLY AMOUNT + FX
-        item = db.query(ExpenseItem).filter_by(
-            id=attachment.expense_item_id
-        ).first()
-
-        if not item:
-            return
-
-        ocr = result["ocr_json"]
-        if ocr.get("total") and ocr.get("currency"):
-            item.amount = float(ocr["total"])
-            item.currency = ocr["currency"].upper()
-
-            resolved = resolve_amount(
-                amount=item.amount,
-                currency=item.currency,
-                source="ocr",
-                conversion_date=date.today(),
-            )
-
-            item.amount_eur = resolved["amount_eur"]
-            item.exchange_rate = resolved["exchange_rate"]
-            item.exchange_rate_date = resolved["exchange_rate_date"]
-            item.amount_source = "ocr"
-
-            db.commit()
-            recalculate_report_total_eur(db, item.report_id)
-
-    except Exception as e:
-        if attachment:
-            attachment.ocr_status = "FAILED"
-            attachment.ocr_error = str(e)[:2000]
-            db.commit()
-        print("[OCR FAILED]", repr(e))
-
-    finally:
-        db.close()
-
-
 # -------------------------------------------------------------------
 # UPLOAD ATTACHMENTS (MULTI-FILE)
 # POST /api/attachments/items/{item_id}
@@ -162,14 +63,19 @@ def run_ocr_task(attachment_id: str):
 def upload_attachment(
     item_id: str,
     file: UploadFile = File(...),
-    background_tasks: BackgroundTasks = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    item = get_item_and_report(db, item_id, current_user)
+    has_attachment = (
+        exists().where(Attachment.expense_item_id == ExpenseItem.id).label("has_attachment")
+    )
+    item = item_access(
+        db, item_id, current_user, has_attachment,
+        locked="Expense report is locked",
+    )
 
     # 🚨 BUSINESS RULE: only ONE attachment per expense item
-    if len(item.attachments) >= 1:
+    if item.has_attachment:
         raise HTTPException(
             status_code=400,
             detail="Only one attachment is allowed per expense item"
@@ -182,24 +88,55 @@ def upload_attachment(
     filename = f"{uuid.uuid4()}.{ext}"
     file_path = os.path.join(UPLOAD_DIR, filename)
 
+    # stream to disk, hashing on the way (dedup of identical receipts)
+    digest = hashlib.sha256()
     with open(file_path, "wb") as f:
-        f.write(file.file.read())
+        while chunk := file.file.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            f.write(chunk)
+    content_sha256 = digest.hexdigest()
 
     attachment = Attachment(
-        expense_item_id=item.id,
+        expense_item_id=item.item_id,
         filename=file.filename,
         content_type=file.content_type,
         file_path=file_path,
+        content_sha256=content_sha256,
         ocr_status="PENDING",
         ocr_error=None,
     )
 
     db.add(attachment)
-    db.commit()
-    db.refresh(attachment)
+    db.flush()
+    attachment_id = attachment.id
+
+    cached = find_cached_result(db, content_sha256)
+    if cached is not None:
+        # same file already OCR'd: reuse it, no PaddleOCR / LLM call
+        store_ocr_result(db, attachment, cached)
+        try:
+            apply_ocr_amount(db, attachment, cached["ocr_json"])
+        except Exception as e:
+            # FX unavailable: let the worker retry the amount step
+            db.rollback()
+            print("[OCR CACHE] amount not applied:", repr(e))
+            enqueue_ocr_job(db, attachment.id)
+            db.commit()
+    else:
+        # OCR runs in the worker processes (python -m app.ocr.worker);
+        # the job row is committed together with the attachment
+        enqueue_ocr_job(db, attachment.id)
+        db.commit()
 
-    if background_tasks:
-        background_tasks.add_task(run_ocr_task, str(attachment.id))
+    # refresh() would leave ocr_json deferred, and reading it would then
+    # load the whole ocr_payload group (ocr_text included)
+    attachment = (
+        db.query(Attachment)
+        .options(undefer(Attachment.ocr_json))
+        .populate_existing()
+        .filter(Attachment.id == attachment_id)
+        .one()
+    )
 
     return {
         "id": str(attachment.id),
@@ -208,7 +145,7 @@ def upload_attachment(
         "content_type": attachment.content_type,
         "file_path": attachment.file_path,
         "ocr_status": attachment.ocr_status,
-        "ocr_json": None, 
+        "ocr_json": attachment.ocr_json,
     }
 
         
@@ -228,21 +165,11 @@ def get_attachment_ocr(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    attachment = db.query(Attachment).filter_by(id=attachment_id).first()
-    if not attachment:
-        raise HTTPException(status_code=404, detail="Attachment not found")
-
-    # ownership + draft lock (via item -> report)
-    item = db.query(ExpenseItem).filter_by(id=attachment.expense_item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Expense item not found")
-
-    report = db.query(ExpenseReport).filter_by(id=item.report_id).first()
-    if not report:
-        raise HTTPException(status_code=404, detail="Expense report not found")
-
-    if report.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    # ownership (via item -> report) + OCR columns, one query
+    attachment = attachment_access(
+        db, attachment_id, current_user,
+        Attachment.ocr_status, Attachment.ocr_json, Attachment.ocr_error,
+    )
 
     return {
         "status": attachment.ocr_status,
@@ -262,21 +189,11 @@ def get_attachment_file(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    attachment = db.query(Attachment).filter_by(id=attachment_id).first()
-    if not attachment:
-        raise HTTPException(status_code=404, detail="Attachment not found")
-
-    item = db.query(ExpenseItem).filter_by(id=attachment.expense_item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Expense item not found")
-
-    report = db.query(ExpenseReport).filter_by(id=item.report_id).first()
-    if not report:
-        raise HTTPException(status_code=404, detail="Expense report not found")
-
     # ownership check
-    if report.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    attachment = attachment_access(
+        db, attachment_id, current_user,
+        Attachment.file_path, Attachment.filename,
+    )
 
     if not attachment.file_path or not os.path.exists(attachment.file_path):
         raise HTTPException(status_code=404, detail="File not found on server")
@@ -311,23 +228,11 @@ def delete_attachment(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    attachment = db.query(Attachment).filter_by(id=attachment_id).first()
-    if not attachment:
-        raise HTTPException(status_code=404, detail="Attachment not found")
-
-    item = db.query(ExpenseItem).filter_by(id=attachment.expense_item_id).first()
-    if not item:
-        raise HTTPException(status_code=404, detail="Expense item not found")
-
-    report = db.query(ExpenseReport).filter_by(id=item.report_id).first()
-    if not report:
-        raise HTTPException(status_code=404, detail="Expense report not found")
-
-    if report.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    if report.status != ExpenseReportStatus.draft:
-        raise HTTPException(status_code=403, detail="Expense report is locked")
+    attachment = attachment_access(
+        db, attachment_id, current_user,
+        Attachment.file_path,
+        locked="Expense report is locked",
+    )
 
     # delete file from disk (optional safe cleanup)
     try:
@@ -336,7 +241,9 @@ def delete_attachment(
     except Exception:
         pass
 
-    db.delete(attachment)
+    # ocr_jobs rows go with it (ON DELETE CASCADE)
+    db.query(Attachment).filter(Attachment.id == attachment.attachment_id).delete(
+        synchronize_session=False
+    )
     db.commit()
-    db.refresh(item)
     return None
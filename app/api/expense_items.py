@@ -1,23 +1,46 @@
 from uuid import UUID
 import uuid as uuid_lib
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload, undefer
 
+from app.core.currencies import normalize_currency
 from app.db.session import get_db
 from app.api.auth import get_current_user
+from app.api.guards import owned_item, owned_report
 from app.models.user import User
 from app.models.expense_item import ExpenseItem
-from app.models.expense_report import ExpenseReport, ExpenseReportStatus
+from app.models.attachment import Attachment
 from app.schemas.expense_item import (
     ExpenseItemCreate,
     ExpenseItemUpdate,
     ExpenseItemResponse,
 )
-from app.utils.calculations import recalculate_report_total_eur
+from app.utils.calculations import apply_report_total_delta
 
 router = APIRouter(tags=["Expense items"])
 
 
+def _currency_code(value):
+    if not value:
+        return None
+    code = normalize_currency(value)
+    if code is None:
+        raise HTTPException(400, f"Unsupported currency: {value}")
+    return code
+
+
+def _item_response(db: Session, item_id) -> ExpenseItem:
+    # reload after commit with attachments[].ocr_json in one extra query,
+    # instead of one lazy load per attachment while serializing
+    return (
+        db.query(ExpenseItem)
+        .options(selectinload(ExpenseItem.attachments).undefer(Attachment.ocr_json))
+        .populate_existing()
+        .filter(ExpenseItem.id == item_id)
+        .one()
+    )
+
+
 @router.post(
     "/expense-reports/{report_id}/items",
     response_model=ExpenseItemResponse,
@@ -29,31 +52,25 @@ def create_item(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    report = db.query(ExpenseReport).filter(ExpenseReport.id == report_id).first()
-    if not report:
-        raise HTTPException(404, "Report not found")
-    if report.user_id != current_user.id:
-        raise HTTPException(403, "Not authorized")
-    if report.status != ExpenseReportStatus.draft:
-        raise HTTPException(403, "Report is locked")
+    report = owned_report(db, report_id, current_user, locked="Report is locked")
 
+    item_id = uuid_lib.uuid4()
     item = ExpenseItem(
-        id=uuid_lib.uuid4(),
+        id=item_id,
         report_id=report.id,
         topic=payload.topic,
         type=payload.type,
         date=payload.date,
         payment_type=payload.payment_type,
         comment=payload.comment,
-        currency=payload.currency.upper() if payload.currency else None,
+        currency=_currency_code(payload.currency),
         amount=payload.amount,
         amount_source="manual" if payload.amount and payload.currency else None,
     )
     db.add(item)
+    apply_report_total_delta(db, report.id, None, item.amount_eur)
     db.commit()
-    db.refresh(item)
-    recalculate_report_total_eur(db, report.id)
-    return item
+    return _item_response(db, item_id)
 
 
 @router.put("/items/{item_id}", response_model=ExpenseItemResponse)
@@ -63,19 +80,13 @@ def update_item(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    item = db.query(ExpenseItem).filter(ExpenseItem.id == item_id).first()
-    if not item:
-        raise HTTPException(404, "Item not found")
+    item = owned_item(db, item_id, current_user, locked="Only draft reports can be modified")
 
-    report = item.report
-    if report.user_id != current_user.id:
-        raise HTTPException(403, "Not authorized")
-    if report.status != ExpenseReportStatus.draft:
-        raise HTTPException(403, "Only draft reports can be modified")
+    old_amount_eur = item.amount_eur
 
     data = payload.model_dump(exclude_unset=True)
-    if "currency" in data and data["currency"]:
-        data["currency"] = data["currency"].upper()
+    if "currency" in data:
+        data["currency"] = _currency_code(data["currency"])
 
     for k, v in data.items():
         setattr(item, k, v)
@@ -84,10 +95,9 @@ def update_item(
         if item.amount is not None and item.currency is not None:
             item.amount_source = "manual"
 
+    apply_report_total_delta(db, item.report_id, old_amount_eur, item.amount_eur)
     db.commit()
-    db.refresh(item)
-    recalculate_report_total_eur(db, report.id)
-    return item
+    return _item_response(db, item_id)
 
 
 @router.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -96,17 +106,9 @@ def delete_item(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    item = db.query(ExpenseItem).filter(ExpenseItem.id == item_id).first()
-    if not item:
-        raise HTTPException(404, "Item not found")
-
-    report = item.report
-    if report.user_id != current_user.id:
-        raise HTTPException(403, "Not authorized")
-    if report.status != ExpenseReportStatus.draft:
-        raise HTTPException(403, "Only draft reports can be modified")
+    item = owned_item(db, item_id, current_user, locked="Only draft reports can be modified")
 
+    apply_report_total_delta(db, item.report_id, item.amount_eur, None)
     db.delete(item)
     db.commit()
-    recalculate_report_total_eur(db, report.id)
     return None
@@ -1,21 +1,27 @@
 # app/api/expense_reports.py
 
+import base64
 from datetime import datetime
+from typing import Optional, Tuple
 from uuid import UUID
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import exists, tuple_
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from app.db.session import get_db
 from app.api.auth import get_current_user
+from app.api.guards import owned_report
 from app.models.user import User
 from app.models.expense_report import ExpenseReport, ExpenseReportStatus
 from app.models.expense_item import ExpenseItem
+from app.models.attachment import Attachment
 from app.schemas.expense_report import (
     ExpenseReportCreate,
     ExpenseReportUpdate,
     ExpenseReportOut,
+    ExpenseReportSummary,
 )
 from app.core.roles import ROLE_EMPLOYEE
 from app.core.permissions import require_roles
@@ -54,19 +60,64 @@ def create_report(
 # --------------------------------------------------
 # LIST MY REPORTS
 # --------------------------------------------------
-@router.get("", response_model=list[ExpenseReportOut])
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_cursor(report: ExpenseReport) -> str:
+    raw = f"{report.created_at.isoformat()}|{report.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        created_at, report_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(report_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("", response_model=list[ExpenseReportSummary | ExpenseReportOut])
 def list_my_reports(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    include: Optional[str] = Query(None, pattern="^items$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    return (
+    """
+    Newest first, `limit` per page. The next page is requested with the
+    X-Next-Cursor response header (absent on the last page).
+    Items are only returned with ?include=items.
+    """
+    query = (
         db.query(ExpenseReport)
-        .options(joinedload(ExpenseReport.items).joinedload(ExpenseItem.attachments))
         .filter(ExpenseReport.user_id == current_user.id)
-        .order_by(ExpenseReport.created_at.desc())
-        .all()
+        .order_by(ExpenseReport.created_at.desc(), ExpenseReport.id.desc())
     )
 
+    # keyset: strictly after the last row of the previous page
+    if cursor:
+        created_at, report_id = _decode_cursor(cursor)
+        query = query.filter(
+            tuple_(ExpenseReport.created_at, ExpenseReport.id) < tuple_(created_at, report_id)
+        )
+
+    if include == "items":
+        query = query.options(
+            selectinload(ExpenseReport.items)
+            .selectinload(ExpenseItem.attachments)
+            .undefer(Attachment.ocr_json)
+        )
+
+    reports = query.limit(limit + 1).all()
+    if len(reports) > limit:
+        reports = reports[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(reports[-1])
+
+    schema = ExpenseReportOut if include == "items" else ExpenseReportSummary
+    return [schema.model_validate(r) for r in reports]
+
 
 # --------------------------------------------------
 # GET ONE REPORT
@@ -77,20 +128,13 @@ def get_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    report = (
-        db.query(ExpenseReport)
-        .options(joinedload(ExpenseReport.items).joinedload(ExpenseItem.attachments))
-        .filter(ExpenseReport.id == report_id)
-        .first()
+    return owned_report(
+        db, report_id, current_user,
+        joinedload(ExpenseReport.items)
+        .joinedload(ExpenseItem.attachments)
+        .undefer(Attachment.ocr_json),
     )
 
-    if not report:
-        raise HTTPException(status_code=404, detail="Report not found")
-    if report.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    return report
-
 
 # --------------------------------------------------
 # UPDATE DRAFT HEADER
@@ -102,14 +146,7 @@ def update_draft(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    report = db.query(ExpenseReport).filter_by(id=report_id).first()
-
-    if not report:
-        raise HTTPException(status_code=404, detail="Report not found")
-    if report.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    if report.status != ExpenseReportStatus.draft:
-        raise HTTPException(status_code=403, detail="Report is locked")
+    report = owned_report(db, report_id, current_user, locked="Report is locked")
 
     for k, v in payload.model_dump(exclude_unset=True).items():
         setattr(report, k, v)
@@ -128,14 +165,7 @@ def delete_draft(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    report = db.query(ExpenseReport).filter_by(id=report_id).first()
-
-    if not report:
-        raise HTTPException(status_code=404, detail="Report not found")
-    if report.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    if report.status != ExpenseReportStatus.draft:
-        raise HTTPException(status_code=403, detail="Only drafts can be deleted")
+    report = owned_report(db, report_id, current_user, locked="Only drafts can be deleted")
 
     db.delete(report)
     db.commit()
@@ -155,15 +185,14 @@ def submit_expense_report(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    report = db.query(ExpenseReport).filter_by(id=report_id).first()
-
-    if not report:
-        raise HTTPException(status_code=404, detail="Expense report not found")
-    if report.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    report = owned_report(
+        db, report_id, current_user,
+        not_found="Expense report not found", forbidden="Access denied",
+    )
     if report.status != ExpenseReportStatus.draft:
         raise HTTPException(status_code=400, detail="Only draft reports can be submitted")
-    if not report.items:
+    # EXISTS instead of loading every item
+    if not db.query(exists().where(ExpenseItem.report_id == report.id)).scalar():
         raise HTTPException(status_code=400, detail="Cannot submit an empty report")
 
     # 🔐 Generate approval token
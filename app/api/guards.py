@@ -0,0 +1,190 @@
+# app/api/guards.py
+#
+# Ownership checks shared by the routers. Each guard resolves
+# attachment -> item -> report, the owner and the report status with ONE
+# joined query, and raises the endpoint's HTTP errors:
+#   404 not found, 403 not the owner,
+#   403 report not a draft (only when `locked=<detail>` is given).
+# Approval links have no user: token_attachment checks the token instead.
+
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import and_, join
+from sqlalchemy.orm import Session
+
+from app.models.attachment import Attachment
+from app.models.expense_item import ExpenseItem
+from app.models.expense_report import ExpenseReport, ExpenseReportStatus
+from app.models.user import User
+
+
+def _as_uuid(value, not_found: str) -> UUID:
+    if isinstance(value, UUID):
+        return value
+    try:
+        return UUID(str(value))
+    except ValueError:
+        raise HTTPException(status_code=404, detail=not_found)
+
+
+def _enforce(row, current_user: User, not_found: str, forbidden: str, locked: Optional[str]):
+    if row is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    if row.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail=forbidden)
+    if locked and row.report_status != ExpenseReportStatus.draft:
+        raise HTTPException(status_code=403, detail=locked)
+    return row
+
+
+# -------------------------------------------------------------------
+# REPORTS
+# -------------------------------------------------------------------
+
+def owned_report(
+    db: Session,
+    report_id,
+    current_user: User,
+    *options,
+    not_found: str = "Report not found",
+    forbidden: str = "Not authorized",
+    locked: Optional[str] = None,
+) -> ExpenseReport:
+    """The report entity (loader `options` applied), owner + status checked."""
+    report = (
+        db.query(ExpenseReport)
+        .options(*options)
+        .filter(ExpenseReport.id == _as_uuid(report_id, not_found))
+        .first()
+    )
+    if report is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    if report.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail=forbidden)
+    if locked and report.status != ExpenseReportStatus.draft:
+        raise HTTPException(status_code=403, detail=locked)
+    return report
+
+
+# -------------------------------------------------------------------
+# ITEMS
+# -------------------------------------------------------------------
+
+def owned_item(
+    db: Session,
+    item_id,
+    current_user: User,
+    *,
+    not_found: str = "Item not found",
+    forbidden: str = "Not authorized",
+    locked: Optional[str] = None,
+) -> ExpenseItem:
+    """The item entity; its report's owner and status come from the same query."""
+    row = (
+        db.query(
+            ExpenseItem,
+            ExpenseReport.user_id.label("owner_id"),
+            ExpenseReport.status.label("report_status"),
+        )
+        .join(ExpenseReport, ExpenseReport.id == ExpenseItem.report_id)
+        .filter(ExpenseItem.id == _as_uuid(item_id, not_found))
+        .first()
+    )
+    return _enforce(row, current_user, not_found, forbidden, locked).ExpenseItem
+
+
+def item_access(
+    db: Session,
+    item_id,
+    current_user: User,
+    *columns,
+    not_found: str = "Expense item not found",
+    forbidden: str = "Access denied",
+    locked: Optional[str] = None,
+):
+    """Row of item_id, report_id, owner_id, report_status + `columns`."""
+    row = (
+        db.query(
+            ExpenseItem.id.label("item_id"),
+            ExpenseItem.report_id.label("report_id"),
+            ExpenseReport.user_id.label("owner_id"),
+            ExpenseReport.status.label("report_status"),
+            *columns,
+        )
+        .join(ExpenseReport, ExpenseReport.id == ExpenseItem.report_id)
+        .filter(ExpenseItem.id == _as_uuid(item_id, not_found))
+        .first()
+    )
+    return _enforce(row, current_user, not_found, forbidden, locked)
+
+
+# -------------------------------------------------------------------
+# ATTACHMENTS
+# -------------------------------------------------------------------
+
+def attachment_access(
+    db: Session,
+    attachment_id,
+    current_user: User,
+    *columns,
+    not_found: str = "Attachment not found",
+    forbidden: str = "Access denied",
+    locked: Optional[str] = None,
+):
+    """Row of attachment_id, item_id, report_id, owner_id, report_status + `columns`."""
+    row = (
+        db.query(
+            Attachment.id.label("attachment_id"),
+            ExpenseItem.id.label("item_id"),
+            ExpenseItem.report_id.label("report_id"),
+            ExpenseReport.user_id.label("owner_id"),
+            ExpenseReport.status.label("report_status"),
+            *columns,
+        )
+        .join(ExpenseItem, ExpenseItem.id == Attachment.expense_item_id)
+        .join(ExpenseReport, ExpenseReport.id == ExpenseItem.report_id)
+        .filter(Attachment.id == _as_uuid(attachment_id, not_found))
+        .first()
+    )
+    return _enforce(row, current_user, not_found, forbidden, locked)
+
+
+def token_attachment(
+    db: Session,
+    token: str,
+    attachment_id,
+    *columns,
+    invalid: str = "Invalid or expired link",
+    not_found: str = "Attachment not found",
+):
+    """
+    Row of report_id, attachment_id + `columns` for an approval link.
+    The report is outer-joined to (attachment JOIN item), so one query
+    tells an unknown token (404 `invalid`) from an attachment that is
+    missing or belongs to another report (404 `not_found`).
+    """
+    attachment_uuid = _as_uuid(attachment_id, not_found)
+    row = (
+        db.query(
+            ExpenseReport.id.label("report_id"),
+            Attachment.id.label("attachment_id"),
+            *columns,
+        )
+        .select_from(ExpenseReport)
+        .outerjoin(
+            join(Attachment, ExpenseItem, ExpenseItem.id == Attachment.expense_item_id),
+            and_(
+                ExpenseItem.report_id == ExpenseReport.id,
+                Attachment.id == attachment_uuid,
+            ),
+        )
+        .filter(ExpenseReport.approval_token == token)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail=invalid)
+    if row.attachment_id is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    return row
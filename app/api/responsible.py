@@ -1,10 +1,8 @@
 from fastapi import APIRouter, HTTPException, Depends, Body
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from datetime import datetime
 from app.models.user import User
 from fastapi.responses import Response
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 from io import BytesIO
 from mimetypes import guess_type
 from uuid import UUID
@@ -13,6 +11,7 @@ from app.models.expense_report import ExpenseReport, ExpenseReportStatus
 from app.models.expense_item import ExpenseItem
 from app.models.attachment import Attachment
 from app.api.auth import get_current_user
+from app.api.guards import owned_report, token_attachment
 from app.core.roles import ROLE_EMPLOYEE
 from app.core.permissions import require_roles
 from fastapi.responses import FileResponse
@@ -27,6 +26,7 @@ def get_report_by_token(token: str, db: Session = Depends(get_db)):
         .options(
             joinedload(ExpenseReport.items)
             .joinedload(ExpenseItem.attachments)
+            .undefer_group("ocr_payload")
         )
         .filter(ExpenseReport.approval_token == token)
         .first()
@@ -126,12 +126,9 @@ def get_approval_link(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    report = db.query(ExpenseReport).filter_by(id=report_id).first()
-    if not report:
-        raise HTTPException(status_code=404)
-
-    if report.user_id != current_user.id:
-        raise HTTPException(status_code=403)
+    report = owned_report(
+        db, report_id, current_user, not_found="Not Found", forbidden="Forbidden"
+    )
 
     if report.status != ExpenseReportStatus.pending:
         raise HTTPException(status_code=400, detail="Report not pending")
@@ -147,7 +144,16 @@ def download_report_pdf(
     token: str,
     db: Session = Depends(get_db),
 ):
-    report = db.query(ExpenseReport).filter_by(approval_token=token).first()
+    # reportlab (and PIL behind it) is only loaded when a PDF is requested
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    report = (
+        db.query(ExpenseReport)
+        .options(selectinload(ExpenseReport.items).selectinload(ExpenseItem.attachments))
+        .filter_by(approval_token=token)
+        .first()
+    )
     if not report:
         raise HTTPException(status_code=404, detail="Invalid or expired link")
 
@@ -228,27 +234,11 @@ def responsible_view_attachment(
     attachment_id: UUID,
     db: Session = Depends(get_db),
 ):
-    # 1️⃣ Validate approval token
-    report = (
-        db.query(ExpenseReport)
-        .filter(ExpenseReport.approval_token == token)
-        .first()
-    )
-    if not report:
-        raise HTTPException(status_code=404, detail="Invalid or expired link")
-
-    # 2️⃣ Ensure attachment belongs to this report
-    attachment = (
-        db.query(Attachment)
-        .join(ExpenseItem)
-        .filter(
-            Attachment.id == attachment_id,
-            ExpenseItem.report_id == report.id,
-        )
-        .first()
+    # approval token + attachment of that report, one query
+    attachment = token_attachment(
+        db, token, attachment_id,
+        Attachment.filename, Attachment.content_type, Attachment.file_path,
     )
-    if not attachment:
-        raise HTTPException(status_code=404, detail="Attachment not found")
 
     media_type, _ = guess_type(attachment.filename)
     media_type = media_type or attachment.content_type or "application/octet-stream"
@@ -29,4 +29,113 @@ class Settings:
     SMTP_USER: str = os.getenv("SMTP_USER")
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD")
 
+    # FX RATES: how long rates that a later load may replace (today's,
+    # or a date without its own rates) are reused before re-reading fx_rates
+    FX_CACHE_TTL_SECONDS: int = int(os.getenv("FX_CACHE_TTL_SECONDS", "600"))
+    # background refresh from the FX API (API process + OCR worker supervisor)
+    FX_REFRESH_ENABLED: bool = os.getenv("FX_REFRESH_ENABLED", "true").lower() == "true"
+    FX_REFRESH_INTERVAL_SECONDS: int = int(os.getenv("FX_REFRESH_INTERVAL_SECONDS", "3600"))
+    # last known rates, used while fx_rates is empty: the copy rewritten
+    # after each refresh (runtime directory, like uploads/), else the
+    # read-only snapshot bundled with the code
+    FX_SNAPSHOT_PATH: str = os.getenv(
+        "FX_SNAPSHOT_PATH", os.path.join("runtime", "fx_snapshot.json")
+    )
+    FX_SNAPSHOT_SEED_PATH: str = os.getenv(
+        "FX_SNAPSHOT_SEED_PATH",
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "fx_snapshot.json"),
+    )
+
+    # OCR WORKERS
+    OCR_WORKER_PROCESSES: int = int(os.getenv("OCR_WORKER_PROCESSES", "2"))
+    OCR_LANG: str = os.getenv("OCR_LANG", "fr")
+    # OCR engines per worker process, and jobs before an engine is replaced
+    OCR_ENGINE_POOL_SIZE: int = int(
+        os.getenv("OCR_ENGINE_POOL_SIZE", os.getenv("OCR_PAGE_PARALLELISM", "2"))
+    )
+    OCR_ENGINE_MAX_JOBS: int = int(os.getenv("OCR_ENGINE_MAX_JOBS", "500"))
+
+    # TIERED OCR: fast pass first, orientation + unwarping only when the
+    # fast pass of the whole document (all PDF pages together) has no
+    # total or is below OCR_ESCALATE_MIN_CONFIDENCE
+    OCR_TIERED: bool = os.getenv("OCR_TIERED", "true").lower() == "true"
+    OCR_ESCALATE_MIN_CONFIDENCE: float = float(os.getenv("OCR_ESCALATE_MIN_CONFIDENCE", "0.85"))
+
+    # IMAGE PREPROCESSING (grayscale, crop to receipt, downscale)
+    OCR_PREPROCESS: bool = os.getenv("OCR_PREPROCESS", "true").lower() == "true"
+    # median glyph height (px) the image is scaled down to
+    OCR_TARGET_TEXT_HEIGHT: int = int(os.getenv("OCR_TARGET_TEXT_HEIGHT", "32"))
+    OCR_MAX_IMAGE_SIDE: int = int(os.getenv("OCR_MAX_IMAGE_SIDE", "2500"))
+
+    # PDF pages with at least this many alphanumeric chars in their text
+    # layer are read directly, without rasterization + OCR
+    OCR_PDF_TEXT_MIN_CHARS: int = int(os.getenv("OCR_PDF_TEXT_MIN_CHARS", "40"))
+    OCR_PDF_DPI: int = int(os.getenv("OCR_PDF_DPI", "250"))
+    OCR_PDF_MAX_PAGES: int = int(os.getenv("OCR_PDF_MAX_PAGES", "10"))
+    # pages OCR'd concurrently inside one worker process (bounded by the engine pool)
+    OCR_PAGE_PARALLELISM: int = int(os.getenv("OCR_PAGE_PARALLELISM", "2"))
+    # stop reading a PDF once a page with a recognizable total was found
+    OCR_PDF_EARLY_EXIT: bool = os.getenv("OCR_PDF_EARLY_EXIT", "false").lower() == "true"
+
+    # RULE-BASED EXTRACTION: the LLM is only called below this confidence
+    OCR_RULES_ENABLED: bool = os.getenv("OCR_RULES_ENABLED", "true").lower() == "true"
+    OCR_RULES_MIN_CONFIDENCE: float = float(os.getenv("OCR_RULES_MIN_CONFIDENCE", "0.9"))
+    # share of rule hits still sent to the LLM to measure agreement
+    OCR_RULES_SHADOW_RATE: float = float(os.getenv("OCR_RULES_SHADOW_RATE", "0.05"))
+
+    # GROQ CLIENT (quota is shared by all OCR worker processes)
+    GROQ_MAX_IN_FLIGHT: int = int(os.getenv("GROQ_MAX_IN_FLIGHT", "4"))
+    GROQ_REQUESTS_PER_MINUTE: int = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+    GROQ_TOKENS_PER_MINUTE: int = int(os.getenv("GROQ_TOKENS_PER_MINUTE", "12000"))
+    GROQ_EXPECTED_COMPLETION_TOKENS: int = int(os.getenv("GROQ_EXPECTED_COMPLETION_TOKENS", "300"))
+    GROQ_MAX_RETRIES: int = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+    GROQ_TIMEOUT_SECONDS: float = float(os.getenv("GROQ_TIMEOUT_SECONDS", "60"))
+
+    # LLM PROVIDER: "groq", or "openai_compatible" for any OpenAI-style
+    # endpoint (e.g. the offline stub: uvicorn app.ocr.llm_stub:app --port 8089)
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "groq").lower()
+    LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "http://localhost:8089/v1")
+    LLM_API_KEY: str = os.getenv("LLM_API_KEY")
+
+    # LLM STUB (load testing only): mean latency, jitter, injected failures
+    LLM_STUB_LATENCY_MS: int = int(os.getenv("LLM_STUB_LATENCY_MS", "800"))
+    LLM_STUB_JITTER_MS: int = int(os.getenv("LLM_STUB_JITTER_MS", "200"))
+    LLM_STUB_ERROR_RATE: float = float(os.getenv("LLM_STUB_ERROR_RATE", "0"))
+    LLM_STUB_RATE_LIMIT_RATE: float = float(os.getenv("LLM_STUB_RATE_LIMIT_RATE", "0"))
+    LLM_STUB_RETRY_AFTER_SECONDS: int = int(os.getenv("LLM_STUB_RETRY_AFTER_SECONDS", "2"))
+
+    # LLM PROMPT COMPACTION
+    LLM_PROMPT_COMPACTION: bool = os.getenv("LLM_PROMPT_COMPACTION", "true").lower() == "true"
+    LLM_PROMPT_MAX_TOKENS: int = int(os.getenv("LLM_PROMPT_MAX_TOKENS", "1500"))
+    LLM_PROMPT_HEADER_LINES: int = int(os.getenv("LLM_PROMPT_HEADER_LINES", "5"))
+
+    # receipts per chat completion in bulk backfills (app.ocr.backfill)
+    LLM_BATCH_SIZE: int = int(os.getenv("LLM_BATCH_SIZE", "8"))
+
+    # LLM RESPONSE CACHE
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+    LLM_CACHE_EVICT_EVERY: int = int(os.getenv("LLM_CACHE_EVICT_EVERY", "100"))
+
+    # OCR JOB QUEUE
+    OCR_JOB_MAX_ATTEMPTS: int = int(os.getenv("OCR_JOB_MAX_ATTEMPTS", "5"))
+    OCR_JOB_RETRY_BASE_SECONDS: int = int(os.getenv("OCR_JOB_RETRY_BASE_SECONDS", "30"))
+    OCR_JOB_RETRY_MAX_SECONDS: int = int(os.getenv("OCR_JOB_RETRY_MAX_SECONDS", "1800"))
+    # running jobs refresh locked_at every OCR_JOB_HEARTBEAT_SECONDS; the
+    # sweeper requeues those not refreshed for OCR_JOB_STALE_SECONDS
+    OCR_JOB_HEARTBEAT_SECONDS: int = int(os.getenv("OCR_JOB_HEARTBEAT_SECONDS", "60"))
+    OCR_JOB_STALE_SECONDS: int = int(os.getenv("OCR_JOB_STALE_SECONDS", "900"))
+    OCR_WORKER_POLL_SECONDS: float = float(os.getenv("OCR_WORKER_POLL_SECONDS", "2"))
+    OCR_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("OCR_SWEEP_INTERVAL_SECONDS", "60"))
+    # each worker process logs its metrics snapshot (dedup hits, OCR tiers,
+    # rule hits) this often, as a single "[OCR METRICS]" JSON line
+    OCR_METRICS_LOG_INTERVAL_SECONDS: int = int(os.getenv("OCR_METRICS_LOG_INTERVAL_SECONDS", "300"))
+
+    # totals are maintained by delta; this check (in the OCR worker
+    # supervisor) re-syncs any report whose total drifted from its items
+    REPORT_TOTALS_CHECK_INTERVAL_SECONDS: int = int(
+        os.getenv("REPORT_TOTALS_CHECK_INTERVAL_SECONDS", "3600")
+    )
+
 settings = Settings()
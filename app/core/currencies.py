@@ -0,0 +1,42 @@
+# app/core/currencies.py
+#
+# Canonical ISO codes for everything users and the LLM write as a currency:
+# codes, symbols, local names ("YUAN" from the UI, "€", "Dinars"...).
+# The table is expanded once at import; a lookup is a single dict get.
+
+from typing import Dict, Optional
+
+CURRENCY_ALIASES: Dict[str, list] = {
+    "EUR": ["EUR", "€", "EURO", "EUROS"],
+    # no bare "$" / "dollar": also MXN, CAD... -> unknown, never a guessed USD
+    "USD": ["USD", "US$", "USD$", "US DOLLAR", "US DOLLARS"],
+    "TND": ["TND", "DT", "TD", "DINAR", "DINARS", "DINAR TUNISIEN", "DINARS TUNISIENS", "د.ت"],
+    "INR": ["INR", "₹", "RS", "RS.", "RUPEE", "RUPEES", "ROUPIE", "ROUPIES"],
+    "CNY": ["CNY", "RMB", "YUAN", "RENMINBI", "¥", "￥", "元"],
+    "KRW": ["KRW", "WON", "₩", "원"],
+}
+
+CANONICAL_CURRENCIES = frozenset(CURRENCY_ALIASES)
+
+
+def _expand(aliases: Dict[str, list]) -> Dict[str, str]:
+    # common spellings are stored as-is, so most lookups skip upper()/strip()
+    table = {}
+    for code, names in aliases.items():
+        for name in names:
+            for variant in (name, name.upper(), name.lower(), name.title()):
+                table[variant] = code
+    return table
+
+
+_LOOKUP = _expand(CURRENCY_ALIASES)
+
+
+def normalize_currency(value: Optional[str]) -> Optional[str]:
+    """Canonical ISO code, or None when the value is empty or unknown."""
+    if not value:
+        return None
+    code = _LOOKUP.get(value)
+    if code is None:
+        code = _LOOKUP.get(" ".join(str(value).split()).upper())
+    return code
@@ -0,0 +1,58 @@
+# app/core/metrics.py
+#
+# Minimal in-process counters and timers. Each process (API worker,
+# OCR worker) keeps its own values; GET /api/metrics exposes the API
+# process view, OCR worker processes log theirs every
+# OCR_METRICS_LOG_INTERVAL_SECONDS (see log_snapshot).
+
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_timings = {}  # name -> [count, total_seconds, max_seconds]
+
+
+def incr(name: str, value: int = 1):
+    with _lock:
+        _counters[name] += value
+
+
+def observe(name: str, seconds: float):
+    with _lock:
+        t = _timings.setdefault(name, [0, 0.0, 0.0])
+        t[0] += 1
+        t[1] += seconds
+        t[2] = max(t[2], seconds)
+
+
+@contextmanager
+def timed(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "timings": {
+                name: {
+                    "count": count,
+                    "avg_ms": round(total / count * 1000, 2) if count else 0.0,
+                    "max_ms": round(peak * 1000, 2),
+                }
+                for name, (count, total, peak) in _timings.items()
+            },
+        }
+
+
+def log_snapshot(tag: str):
+    """Print the snapshot as one JSON line, for processes without an endpoint."""
+    print(f"[{tag}]", json.dumps(snapshot(), sort_keys=True))
@@ -1,15 +1,16 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.db.session import engine
-from app.db.base import Base
-
 from app.api.auth import router as auth_router
 from app.api.expense_reports import router as expense_reports_router
 from app.api.expense_items import router as expense_items_router
 from app.api.attachments import router as attachments_router
 from app.api.reference_data import router as reference_data_router
 from app.api.responsible import router as responsible_router
+from app.core import metrics
+from app.core.permissions import require_roles
+from app.core.roles import ROLE_ADMIN
+from app.services.fx_loader import start_fx_refresher, stop_fx_refresher
 
 app = FastAPI(title="Expense Management API")
 
@@ -19,10 +20,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
-# DEV ONLY
-Base.metadata.create_all(bind=engine)
+# schema is managed by migrations: alembic upgrade head
+
+@app.on_event("startup")
+def on_startup():
+    start_fx_refresher()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    stop_fx_refresher()
 
 # ROUTERS
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
@@ -37,3 +47,8 @@ app.include_router(responsible_router)
 @app.get("/api/health")
 def health():
     return {"status": "ok"}
+
+
+@app.get("/api/metrics", dependencies=[Depends(require_roles([ROLE_ADMIN]))])
+def get_metrics():
+    return metrics.snapshot()
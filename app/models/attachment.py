@@ -1,7 +1,7 @@
 import uuid
 from sqlalchemy import Column, String, ForeignKey, JSON
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from app.db.base import Base
 
@@ -14,17 +14,24 @@ class Attachment(Base):
     expense_item_id = Column(
         UUID(as_uuid=True),
         ForeignKey("expense_items.id", ondelete="CASCADE"),
-        nullable=False
+        nullable=False,
+        index=True,
     )
 
     filename = Column(String, nullable=False)
     content_type = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
 
+    # SHA-256 of the uploaded bytes, used to reuse OCR of identical files
+    content_sha256 = Column(String(64), nullable=True, index=True)
+
     ocr_status = Column(String, nullable=True)
-    ocr_json = Column(JSON, nullable=True)
     ocr_error = Column(String, nullable=True)
-    ocr_text = Column(String, nullable=True)
+
+    # large payloads: not loaded with the row, only where they are returned
+    # (undefer(Attachment.ocr_json) / undefer_group("ocr_payload"))
+    ocr_json = deferred(Column(JSON, nullable=True), group="ocr_payload")
+    ocr_text = deferred(Column(String, nullable=True), group="ocr_payload")
 
     expense_item = relationship(
         "ExpenseItem",
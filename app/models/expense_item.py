@@ -20,7 +20,8 @@ class ExpenseItem(Base):
     report_id = Column(
         UUID(as_uuid=True),
         ForeignKey("expense_reports.id", ondelete="CASCADE"),
-        nullable=False
+        nullable=False,
+        index=True,
     )
 
     topic = Column(String, nullable=False)
@@ -11,6 +11,7 @@ from sqlalchemy import (
     Enum,
     Numeric,
     ForeignKey,
+    Index,
     Text,
 )
 from sqlalchemy.dialects.postgresql import UUID
@@ -28,6 +29,10 @@ class ExpenseReportStatus(str, enum.Enum):
 
 class ExpenseReport(Base):
     __tablename__ = "expense_reports"
+    __table_args__ = (
+        # list_my_reports: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_expense_reports_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Date, DateTime, Numeric
+
+from app.db.base import Base
+
+
+class FxRate(Base):
+    __tablename__ = "fx_rates"
+
+    # units of `currency` for 1 EUR, as published for `date`
+    date = Column(Date, primary_key=True)
+    currency = Column(String(3), primary_key=True)
+    rate = Column(Numeric(18, 8), nullable=False)
+
+    source = Column(String, nullable=True)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, JSON
+
+from app.db.base import Base
+
+
+class LlmCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    # sha256(model, prompt version, normalized OCR text)
+    key = Column(String(64), primary_key=True)
+
+    model = Column(String, nullable=False)
+    prompt_version = Column(String, nullable=False)
+    response = Column(JSON, nullable=False)
+
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    last_used_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base
+
+
+OCR_JOB_QUEUED = "QUEUED"
+OCR_JOB_RUNNING = "RUNNING"
+OCR_JOB_DONE = "DONE"
+OCR_JOB_FAILED = "FAILED"
+
+
+class OcrJob(Base):
+    __tablename__ = "ocr_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    attachment_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("attachments.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False
+    )
+
+    status = Column(String, nullable=False, default=OCR_JOB_QUEUED, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+
+    # earliest time a worker may pick the job up (retry backoff)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    attachment = relationship("Attachment")
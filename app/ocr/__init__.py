@@ -0,0 +1,5 @@
+# app/ocr
+#
+# app.ocr.service and app.ocr.paddle pull in PaddleOCR, OpenCV and
+# PyMuPDF; only the OCR worker (python -m app.ocr.worker) imports them.
+# API modules must stick to the light modules (jobs, ui_summary, ...).
@@ -0,0 +1,142 @@
+# app/ocr/backfill.py
+#
+# Re-interpret historical attachments in bulk:
+#     python -m app.ocr.backfill --status DONE FAILED --batch-size 8
+#
+# Stored OCR text is reused (use --reocr to read the files again); the
+# LLM is called once per batch of receipts instead of once per receipt.
+# Each attachment ends up with exactly what run_ocr_task would store.
+# Amounts are only re-applied to items of draft reports: submitted and
+# decided reports keep the figures their approver saw. Amounts the user
+# entered or corrected by hand (amount_source == "manual") are kept too.
+# A receipt whose OCR or interpretation fails is logged and left as it
+# was; the rest of the batch and the run carry on.
+
+import argparse
+from typing import List
+
+from sqlalchemy.orm import Session, undefer
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import user  # noqa: F401  (relationship target)
+from app.models.attachment import Attachment
+from app.models.expense_item import ExpenseItem
+from app.models.expense_report import ExpenseReport, ExpenseReportStatus
+from app.ocr.service import extract_text, interpret_receipt, interpret_receipts
+from app.services.ocr_result_service import apply_ocr_amount, store_ocr_result
+
+
+def _item_state(db: Session, attachment: Attachment):
+    """(report status, amount_source) of the attachment's item."""
+    return (
+        db.query(ExpenseReport.status, ExpenseItem.amount_source)
+        .join(ExpenseItem, ExpenseItem.report_id == ExpenseReport.id)
+        .filter(ExpenseItem.id == attachment.expense_item_id)
+        .first()
+    )
+
+
+def _process_batch(db: Session, attachments: List[Attachment], reocr: bool) -> int:
+    ready, texts = [], []
+    for att in attachments:
+        try:
+            text = att.ocr_text if (att.ocr_text and not reocr) else extract_text(att.file_path)
+        except Exception as e:
+            print("[BACKFILL] OCR failed", att.id, repr(e))
+            continue
+        ready.append(att)
+        texts.append(text)
+
+    if not ready:
+        return 0
+
+    try:
+        interpreted = interpret_receipts(texts)
+    except Exception as e:
+        # e.g. the LLM cache is unreachable: go receipt by receipt so the
+        # failure is attributed to (and only costs) the receipts it hits
+        print("[BACKFILL] batch interpretation failed", repr(e))
+        interpreted = []
+        for att, text in zip(ready, texts):
+            try:
+                interpreted.append(interpret_receipt(text))
+            except Exception as e:
+                db.rollback()
+                interpreted.append(None)
+                print("[BACKFILL] interpretation error", att.id, repr(e))
+
+    stored = 0
+    for att, text, parsed in zip(ready, texts, interpreted):
+        if parsed is None:
+            # left as it was; a later run retries it
+            metrics.incr("backfill.interpretation_failed")
+            print("[BACKFILL] interpretation failed", att.id)
+            continue
+
+        store_ocr_result(db, att, {"ocr_text": text, "ocr_json": parsed})
+        stored += 1
+
+        state = _item_state(db, att)
+        if state is None or state.status != ExpenseReportStatus.draft:
+            continue
+        if state.amount_source == "manual":
+            # the user corrected this amount: never overwrite it
+            metrics.incr("backfill.manual_kept")
+            continue
+        try:
+            apply_ocr_amount(db, att, parsed)
+        except Exception as e:
+            db.rollback()
+            print("[BACKFILL] amount not applied", att.id, repr(e))
+
+    return stored
+
+
+def backfill(statuses: List[str], batch_size: int, limit: int = 0, reocr: bool = False) -> int:
+    db: Session = SessionLocal()
+    done = 0
+    last_id = None
+
+    try:
+        while not limit or done < limit:
+            size = batch_size if not limit else min(batch_size, limit - done)
+            query = (
+                db.query(Attachment)
+                .options(undefer(Attachment.ocr_text))
+                .filter(Attachment.ocr_status.in_(statuses))
+            )
+            if last_id is not None:
+                query = query.filter(Attachment.id > last_id)
+            batch = query.order_by(Attachment.id).limit(size).all()
+            if not batch:
+                break
+
+            last_id = batch[-1].id
+            done += _process_batch(db, batch, reocr)
+            print(f"[BACKFILL] {done} attachment(s) processed")
+    finally:
+        db.close()
+
+    counters = metrics.snapshot()["counters"]
+    print(f"[BACKFILL] done: {done} attachment(s), "
+          f"{counters.get('backfill.manual_kept', 0)} manual amount(s) kept, "
+          f"{counters.get('backfill.interpretation_failed', 0)} not interpreted")
+    print("[BACKFILL] metrics", counters)
+    return done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk re-interpretation of receipts")
+    parser.add_argument("--status", nargs="+", default=["DONE", "FAILED"])
+    parser.add_argument("--batch-size", type=int, default=settings.LLM_BATCH_SIZE)
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--reocr", action="store_true")
+    args = parser.parse_args()
+
+    backfill(args.status, args.batch_size, args.limit, args.reocr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# app/ocr/compaction.py
+#
+# Shrinks OCR text before it is sent to the LLM: keeps the merchant
+# header and the lines that carry amounts, dates, currencies and payment
+# / total keywords, then caps the result to a token budget. Pages of
+# terms and conditions never reach the prompt.
+
+from typing import List
+
+from app.ocr.rule_extractor import (
+    AMOUNT_RE,
+    CURRENCY_PATTERNS,
+    DATE_PATTERNS,
+    DOLLAR_SIGN_RE,
+    PAYMENT_PATTERNS,
+    STRONG_TOTAL_RE,
+    WEAK_TOTAL_RE,
+)
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+def _score(line: str) -> int:
+    if STRONG_TOTAL_RE.search(line) or WEAK_TOTAL_RE.search(line):
+        return 3
+    if (
+        any(p.search(line) for _, p in PAYMENT_PATTERNS)
+        or any(p.search(line) for _, p in CURRENCY_PATTERNS)
+        or DOLLAR_SIGN_RE.search(line)
+    ):
+        return 2
+    if AMOUNT_RE.search(line) or any(p.search(line) for p, _ in DATE_PATTERNS):
+        return 1
+    return 0
+
+
+def compact_ocr_text(text: str, max_tokens: int = 1500, header_lines: int = 5) -> str:
+    lines: List[str] = []
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if line and (not lines or lines[-1] != line):
+            lines.append(line)
+
+    base = [_score(line) for line in lines]
+    scores = list(base)
+
+    # a total keyword alone on its line: the value sits on the next one
+    for i, line in enumerate(lines[:-1]):
+        if base[i] == 3 and not AMOUNT_RE.search(line):
+            scores[i + 1] = max(scores[i + 1], 3)
+
+    for i in range(min(header_lines, len(lines))):
+        scores[i] = 4  # merchant / address block
+
+    keep = [i for i, s in enumerate(scores) if s > 0]
+
+    # over budget: keep the best lines, the last ones first (totals are at
+    # the bottom of receipts), then restore document order
+    budget = max_tokens * CHARS_PER_TOKEN
+    if sum(len(lines[i]) + 1 for i in keep) > budget:
+        chosen, used = [], 0
+        for i in sorted(keep, key=lambda i: (scores[i], i), reverse=True):
+            cost = len(lines[i]) + 1
+            if used + cost > budget:
+                continue
+            chosen.append(i)
+            used += cost
+        keep = sorted(chosen)
+
+    return "\n".join(lines[i] for i in keep)
@@ -0,0 +1,97 @@
+# app/ocr/engine_pool.py
+import gc
+import threading
+from contextlib import contextmanager
+from typing import Callable, List
+
+from app.core import metrics
+
+
+class _Engine:
+    def __init__(self, ocr):
+        self.ocr = ocr
+        self.jobs = 0
+
+
+class OcrEnginePool:
+    """
+    Bounded pool of OCR engines with checkout / checkin.
+
+    A PaddleOCR predictor must only be used by one thread at a time, so
+    callers hold an engine for the duration of one predict. Engines are
+    created lazily (or all at once by warm_up) up to `size`, and replaced
+    after `max_jobs` uses to cap Paddle's memory growth (0 = never).
+    """
+
+    def __init__(self, factory: Callable, size: int = 1, max_jobs: int = 0):
+        self._factory = factory
+        self._size = max(size, 1)
+        self._max_jobs = max_jobs
+        self._idle: List[_Engine] = []
+        self._created = 0
+        self._cond = threading.Condition()
+
+    def warm_up(self):
+        # each engine is counted only once it exists: a failing factory
+        # leaves the pool's capacity untouched
+        while True:
+            with self._cond:
+                if self._created >= self._size:
+                    return
+
+            engine = self._build()
+            with self._cond:
+                if self._created >= self._size:
+                    return  # filled by concurrent checkouts meanwhile
+                self._created += 1
+                self._idle.append(engine)
+                self._cond.notify()
+
+    def _build(self) -> _Engine:
+        with metrics.timed("ocr.engine.create"):
+            return _Engine(self._factory())
+
+    def _create(self) -> _Engine:
+        # the slot was already counted by _acquire: give it back on failure
+        try:
+            return self._build()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def _acquire(self) -> _Engine:
+        with self._cond:
+            while not self._idle and self._created >= self._size:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+
+        # created outside the lock: model loading takes seconds
+        return self._create()
+
+    def _release(self, engine: _Engine):
+        engine.jobs += 1
+        recycle = self._max_jobs and engine.jobs >= self._max_jobs
+
+        with self._cond:
+            if recycle:
+                self._created -= 1
+            else:
+                self._idle.append(engine)
+            self._cond.notify()
+
+        if recycle:
+            metrics.incr("ocr.engine.recycled")
+            del engine
+            gc.collect()
+
+    @contextmanager
+    def checkout(self):
+        engine = self._acquire()
+        try:
+            yield engine.ocr
+        finally:
+            self._release(engine)
@@ -0,0 +1,5 @@
+# app/ocr/errors.py
+
+
+class PermanentOcrError(RuntimeError):
+    """OCR failure that will not go away on retry (bad file, empty text...)."""
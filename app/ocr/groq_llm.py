@@ -1,7 +1,20 @@
 # app/ocr/groq_llm.py
-import os, json, re
-from groq import Groq
-from app.ocr.schemas import ReceiptData
+import json, re, time
+from typing import List, Optional
+
+from pydantic import ValidationError
+
+from app.core import metrics
+from app.core.config import settings
+from app.ocr.compaction import compact_ocr_text, estimate_tokens
+from app.ocr.schemas import LlmReceipt, ReceiptData
+from app.ocr.llm_providers import LLMResponse, get_llm_provider
+from app.ocr.llm_cache import cache_key, get_cached, put_cached
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+# bump whenever SYSTEM_PROMPT / user prompt change: invalidates the LLM cache
+PROMPT_VERSION = "2"
 
 SYSTEM_PROMPT = """Tu es un interprète de justificatifs de dépense destiné à un système de validation comptable en production.
 
@@ -83,18 +96,79 @@ def _extract_json_str(s: str) -> str:
     return m.group(0)
 
 
-def get_groq_client() -> Groq:
-    key = os.getenv("GROQ_API_KEY")
-    if not key:
-        raise RuntimeError("Missing GROQ_API_KEY")
-    return Groq(api_key=key)
+def _cache_get(key: str):
+    # the cache must never break OCR: on DB errors just call the LLM
+    try:
+        return get_cached(key)
+    except Exception as e:
+        print("[LLM CACHE ERROR]", repr(e))
+        return None
+
+
+def _cache_put(key: str, model: str, data: dict):
+    try:
+        put_cached(key, model, PROMPT_VERSION, data)
+    except Exception as e:
+        print("[LLM CACHE ERROR]", repr(e))
+
+
+def _record_usage(provider: str, model: str, resp: LLMResponse, seconds: float):
+    metrics.incr("llm.calls")
+    metrics.incr("llm.prompt_tokens", resp.prompt_tokens)
+    metrics.incr("llm.completion_tokens", resp.completion_tokens)
+    print(
+        f"[LLM] provider={provider} model={model} prompt_tokens={resp.prompt_tokens} "
+        f"completion_tokens={resp.completion_tokens} ms={seconds * 1000:.0f}"
+    )
+
+
+def _prepare_text(ocr_text: str) -> str:
+    if not settings.LLM_PROMPT_COMPACTION:
+        return ocr_text
+
+    compacted = compact_ocr_text(
+        ocr_text,
+        max_tokens=settings.LLM_PROMPT_MAX_TOKENS,
+        header_lines=settings.LLM_PROMPT_HEADER_LINES,
+    )
+    metrics.incr("llm.ocr_tokens_in", estimate_tokens(ocr_text))
+    metrics.incr("llm.ocr_tokens_kept", estimate_tokens(compacted))
+    return compacted or ocr_text
+
+
+def _cache_model(model: str) -> str:
+    # answers from the local stub must never be served as Groq answers
+    provider = settings.LLM_PROVIDER
+    return model if provider == "groq" else f"{provider}:{model}"
+
+
+def _complete(model: str, user_prompt: str) -> str:
+    provider = get_llm_provider()
+
+    started = time.perf_counter()
+    resp = provider.complete(
+        model=model,
+        temperature=0,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ],
+    )
+
+    _record_usage(provider.name, model, resp, time.perf_counter() - started)
+    return resp.content
 
 
 def parse_receipt_with_llm(
     ocr_text: str,
-    model: str = "llama-3.3-70b-versatile"
+    model: str = DEFAULT_MODEL
 ) -> dict:
-    client = get_groq_client()
+    ocr_text = _prepare_text(ocr_text)
+
+    key = cache_key(ocr_text, _cache_model(model), PROMPT_VERSION)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
 
     user_prompt = f"""
 Texte OCR du justificatif :
@@ -105,15 +179,95 @@ Interprète ce document comme un justificatif de dépense professionnelle
 et retourne uniquement le JSON demandé.
 """
 
-    resp = client.chat.completions.create(
-        model=model,
-        temperature=0,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ],
-    )
-
-    content = resp.choices[0].message.content
+    content = _complete(model, user_prompt)
     data = json.loads(_extract_json_str(content))
+
+    _cache_put(key, _cache_model(model), data)
     return data
+
+
+# -------------------------------------------------
+# BATCH MODE (bulk backfills)
+# -------------------------------------------------
+
+def _extract_json_array(s: str) -> list:
+    s = (s or "").strip()
+    m = re.search(r"\[.*\]", s, flags=re.S)
+    if not m:
+        raise ValueError("LLM response does not contain a JSON array.")
+    data = json.loads(m.group(0))
+    if not isinstance(data, list):
+        raise ValueError("LLM response is not a JSON array.")
+    return data
+
+
+def parse_receipts_with_llm_batch(
+    ocr_texts: List[str],
+    model: str = DEFAULT_MODEL
+) -> List[Optional[dict]]:
+    """
+    Interpret several receipts with one chat completion.
+
+    Returns one dict per input, in order. Each element of the answer is
+    validated against LlmReceipt; anything missing or invalid is retried
+    with a single parse_receipt_with_llm call. A receipt whose retry fails
+    too is None, so one bad receipt does not sink the others.
+    """
+    results: List[Optional[dict]] = [None] * len(ocr_texts)
+    prepared = [_prepare_text(t) for t in ocr_texts]
+    keys = [cache_key(t, _cache_model(model), PROMPT_VERSION) for t in prepared]
+
+    todo = []
+    for i, key in enumerate(keys):
+        cached = _cache_get(key)
+        if cached is not None:
+            results[i] = cached
+        else:
+            todo.append(i)
+
+    answers: list = []
+    if len(todo) > 1:
+        blocks = "\n\n".join(
+            f"### Justificatif {n}\n{prepared[i]}" for n, i in enumerate(todo, start=1)
+        )
+        user_prompt = f"""
+Voici {len(todo)} justificatifs indépendants (texte OCR) :
+
+{blocks}
+
+Interprète chacun comme un justificatif de dépense professionnelle.
+Retourne uniquement un tableau JSON de {len(todo)} objets, dans le même
+ordre que les justificatifs, chaque objet conforme EXACTEMENT au schéma.
+"""
+        try:
+            answers = _extract_json_array(_complete(model, user_prompt))
+        except Exception as e:
+            print("[LLM BATCH ERROR]", repr(e))
+            answers = []
+
+        # a short or long answer cannot be matched to inputs reliably
+        if len(answers) != len(todo):
+            answers = []
+
+    for n, i in enumerate(todo):
+        data = None
+        if answers:
+            try:
+                data = LlmReceipt.model_validate(answers[n]).model_dump()
+            except ValidationError:
+                data = None
+
+        if data is None:
+            if len(todo) > 1:
+                metrics.incr("llm.batch.fallback")
+            try:
+                results[i] = parse_receipt_with_llm(ocr_texts[i], model=model)
+            except Exception as e:
+                metrics.incr("llm.batch.failed")
+                print("[LLM BATCH ERROR] receipt", n + 1, "of", len(todo), repr(e))
+        else:
+            metrics.incr("llm.batch.ok")
+            _cache_put(keys[i], _cache_model(model), data)
+            results[i] = data
+
+    return results
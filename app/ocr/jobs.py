@@ -0,0 +1,197 @@
+# app/ocr/jobs.py
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.attachment import Attachment
+from app.models.ocr_job import (
+    OcrJob,
+    OCR_JOB_QUEUED,
+    OCR_JOB_RUNNING,
+    OCR_JOB_DONE,
+    OCR_JOB_FAILED,
+)
+from app.ocr.errors import PermanentOcrError
+
+# -------------------------------------------------------------------
+# DURABLE OCR JOB QUEUE (Postgres)
+# Workers claim rows with SELECT ... FOR UPDATE SKIP LOCKED, so any
+# number of worker processes / hosts can share the same table.
+# A running job's locked_at is refreshed by its worker's heartbeat; the
+# sweeper only reclaims jobs whose heartbeat stopped, and a worker only
+# records the outcome of a job it still holds.
+# -------------------------------------------------------------------
+
+PERMANENT_ERRORS = (FileNotFoundError, PermanentOcrError)
+
+
+def enqueue_ocr_job(db: Session, attachment_id) -> OcrJob:
+    """Queue (or re-queue) OCR for an attachment. Caller commits."""
+    job = db.query(OcrJob).filter_by(attachment_id=attachment_id).first()
+    if job is None:
+        job = OcrJob(attachment_id=attachment_id)
+        db.add(job)
+
+    job.status = OCR_JOB_QUEUED
+    job.attempts = 0
+    job.last_error = None
+    job.run_after = datetime.utcnow()
+    job.locked_by = None
+    job.locked_at = None
+    return job
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[Tuple[str, str]]:
+    now = datetime.utcnow()
+    job = (
+        db.query(OcrJob)
+        .filter(OcrJob.status == OCR_JOB_QUEUED, OcrJob.run_after <= now)
+        .order_by(OcrJob.run_after)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if not job:
+        db.rollback()
+        return None
+
+    job.status = OCR_JOB_RUNNING
+    job.attempts += 1
+    job.locked_by = worker_id
+    job.locked_at = now
+    db.commit()
+
+    return str(job.id), str(job.attachment_id)
+
+
+def _owned_job(db: Session, job_id: str, worker_id: str) -> Optional[OcrJob]:
+    """The job, locked, if `worker_id` still holds it (not reclaimed by the sweeper)."""
+    return (
+        db.query(OcrJob)
+        .filter(
+            OcrJob.id == job_id,
+            OcrJob.status == OCR_JOB_RUNNING,
+            OcrJob.locked_by == worker_id,
+        )
+        .with_for_update()
+        .first()
+    )
+
+
+def heartbeat_job(db: Session, job_id: str, worker_id: str) -> bool:
+    """Refresh locked_at of a running job; False once the job is no longer ours."""
+    updated = (
+        db.query(OcrJob)
+        .filter(
+            OcrJob.id == job_id,
+            OcrJob.status == OCR_JOB_RUNNING,
+            OcrJob.locked_by == worker_id,
+        )
+        .update({OcrJob.locked_at: datetime.utcnow()}, synchronize_session=False)
+    )
+    db.commit()
+    return updated == 1
+
+
+def mark_job_done(db: Session, job_id: str, worker_id: str) -> bool:
+    job = _owned_job(db, job_id, worker_id)
+    if not job:
+        db.rollback()
+        return False
+
+    job.status = OCR_JOB_DONE
+    job.last_error = None
+    job.locked_by = None
+    job.locked_at = None
+    db.commit()
+    return True
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = settings.OCR_JOB_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, settings.OCR_JOB_RETRY_MAX_SECONDS))
+
+
+def mark_job_failed(db: Session, job_id: str, worker_id: str, error: Exception) -> bool:
+    job = _owned_job(db, job_id, worker_id)
+    if not job:
+        db.rollback()
+        return False
+
+    message = str(error)[:2000]
+    job.last_error = message
+    job.locked_by = None
+    job.locked_at = None
+
+    attachment = db.query(Attachment).filter_by(id=job.attachment_id).first()
+
+    # OCR itself succeeded, only the amount step failed: keep the result
+    ocr_done = attachment is not None and attachment.ocr_status == "DONE"
+
+    permanent = isinstance(error, PERMANENT_ERRORS)
+    if permanent or job.attempts >= settings.OCR_JOB_MAX_ATTEMPTS:
+        job.status = OCR_JOB_FAILED
+        if attachment:
+            attachment.ocr_status = "DONE" if ocr_done else "FAILED"
+            attachment.ocr_error = message
+    else:
+        # transient (Groq, FX, DB...) -> exponential backoff
+        job.status = OCR_JOB_QUEUED
+        job.run_after = datetime.utcnow() + retry_delay(job.attempts)
+        if attachment:
+            attachment.ocr_status = "DONE" if ocr_done else "PENDING"
+            attachment.ocr_error = message
+
+    db.commit()
+    return True
+
+
+# -------------------------------------------------------------------
+# SWEEPER
+# -------------------------------------------------------------------
+
+def requeue_stale_jobs(db: Session) -> int:
+    """Recover jobs whose worker died mid-run (no heartbeat), and attachments with no job."""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.OCR_JOB_STALE_SECONDS)
+
+    stale = (
+        db.query(OcrJob)
+        .filter(OcrJob.status == OCR_JOB_RUNNING, OcrJob.locked_at < cutoff)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    for job in stale:
+        job.locked_by = None
+        job.locked_at = None
+        job.last_error = "Worker lost while processing"
+
+        attachment = db.query(Attachment).filter_by(id=job.attachment_id).first()
+        interrupted = attachment is not None and attachment.ocr_status != "DONE"
+        if job.attempts >= settings.OCR_JOB_MAX_ATTEMPTS:
+            job.status = OCR_JOB_FAILED
+            if interrupted:
+                attachment.ocr_status = "FAILED"
+                attachment.ocr_error = job.last_error
+        else:
+            job.status = OCR_JOB_QUEUED
+            job.run_after = datetime.utcnow()
+            if interrupted:
+                attachment.ocr_status = "PENDING"
+
+    # rows left PENDING / PROCESSING by the old in-memory tasks
+    orphans = (
+        db.query(Attachment.id)
+        .outerjoin(OcrJob, OcrJob.attachment_id == Attachment.id)
+        .filter(
+            OcrJob.id.is_(None),
+            Attachment.ocr_status.in_(["PENDING", "PROCESSING"]),
+        )
+        .all()
+    )
+    for (attachment_id,) in orphans:
+        enqueue_ocr_job(db, attachment_id)
+
+    db.commit()
+    return len(stale) + len(orphans)
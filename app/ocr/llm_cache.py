@@ -0,0 +1,123 @@
+# app/ocr/llm_cache.py
+#
+# Persistent cache of LLM receipt interpretations. The call runs at
+# temperature=0, so the same (model, prompt, OCR text) always gives the
+# same answer: re-runs, retries and duplicate receipts are served from
+# Postgres instead of Groq.
+
+import hashlib
+import itertools
+import re
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.llm_cache import LlmCacheEntry
+
+_WS_RE = re.compile(r"[ \t\u00a0]+")
+
+_puts = itertools.count(1)
+
+
+def normalize_ocr_text(text: str) -> str:
+    lines = (_WS_RE.sub(" ", line).strip() for line in (text or "").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def cache_key(ocr_text: str, model: str, prompt_version: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, prompt_version, normalize_ocr_text(ocr_text)):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def get_cached(key: str) -> Optional[dict]:
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS)
+    db = SessionLocal()
+    try:
+        entry = (
+            db.query(LlmCacheEntry)
+            .filter(LlmCacheEntry.key == key, LlmCacheEntry.created_at >= cutoff)
+            .first()
+        )
+        if not entry:
+            metrics.incr("llm_cache.miss")
+            return None
+
+        entry.hits += 1
+        entry.last_used_at = datetime.utcnow()
+        db.commit()
+        metrics.incr("llm_cache.hit")
+        return entry.response
+    finally:
+        db.close()
+
+
+def put_cached(key: str, model: str, prompt_version: str, response: dict):
+    if not settings.LLM_CACHE_ENABLED:
+        return
+
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        stmt = insert(LlmCacheEntry).values(
+            key=key,
+            model=model,
+            prompt_version=prompt_version,
+            response=response,
+            hits=0,
+            created_at=now,
+            last_used_at=now,
+        )
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[LlmCacheEntry.key],
+                set_={
+                    "response": stmt.excluded.response,
+                    "created_at": now,
+                    "last_used_at": now,
+                },
+            )
+        )
+        db.commit()
+
+        # eviction is a scan: only run it every N writes
+        if next(_puts) % settings.LLM_CACHE_EVICT_EVERY == 0:
+            evict(db)
+    finally:
+        db.close()
+
+
+def evict(db) -> int:
+    """Drop expired entries, then the least recently used beyond the size cap."""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.LLM_CACHE_TTL_SECONDS)
+    expired = (
+        db.query(LlmCacheEntry)
+        .filter(LlmCacheEntry.created_at < cutoff)
+        .delete(synchronize_session=False)
+    )
+
+    overflow_keys = (
+        select(LlmCacheEntry.key)
+        .order_by(LlmCacheEntry.last_used_at.desc())
+        .offset(settings.LLM_CACHE_MAX_ENTRIES)
+    )
+    overflow = (
+        db.query(LlmCacheEntry)
+        .filter(LlmCacheEntry.key.in_(overflow_keys))
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+
+    if expired or overflow:
+        metrics.incr("llm_cache.evicted", expired + overflow)
+    return expired + overflow
@@ -0,0 +1,153 @@
+# app/ocr/llm_client.py
+#
+# One Groq client per process, shared by every OCR job of that process:
+# - AsyncGroq on a dedicated event-loop thread (HTTP keep-alive pool)
+# - at most GROQ_MAX_IN_FLIGHT concurrent requests
+# - request + token buckets sized to the Groq quota
+# - 429 aware backoff (honours Retry-After, pauses every caller)
+
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import List, Optional
+
+import httpx
+from groq import AsyncGroq, RateLimitError
+
+from app.core import metrics
+from app.core.config import settings
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, bursts up to one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def adjust(self, amount: float):
+        # correct an estimate once the real usage is known (may go negative)
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+def _estimate_tokens(messages: List[dict]) -> int:
+    # ~4 chars per token + room for the JSON answer
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return chars // 4 + settings.GROQ_EXPECTED_COMPLETION_TOKENS
+
+
+def _retry_after(error: RateLimitError, attempt: int) -> float:
+    header = None
+    response = getattr(error, "response", None)
+    if response is not None:
+        header = response.headers.get("retry-after")
+    try:
+        return max(float(header), 0.5)
+    except (TypeError, ValueError):
+        return min(2 ** attempt, 60) + random.uniform(0, 1)
+
+
+class GroqPool:
+    def __init__(self):
+        processes = max(settings.OCR_WORKER_PROCESSES, 1)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="groq-client", daemon=True
+        )
+        self._thread.start()
+
+        # quota is per API key: each worker process gets its share
+        self._requests = TokenBucket(settings.GROQ_REQUESTS_PER_MINUTE / processes)
+        self._tokens = TokenBucket(settings.GROQ_TOKENS_PER_MINUTE / processes)
+        self._in_flight = asyncio.Semaphore(settings.GROQ_MAX_IN_FLIGHT)
+        self._paused_until = 0.0
+        self._client: Optional[AsyncGroq] = None
+
+    def _get_client(self) -> AsyncGroq:
+        if self._client is None:
+            key = os.getenv("GROQ_API_KEY")
+            if not key:
+                raise RuntimeError("Missing GROQ_API_KEY")
+            self._client = AsyncGroq(
+                api_key=key,
+                max_retries=0,  # retries are handled here, with the buckets
+                timeout=settings.GROQ_TIMEOUT_SECONDS,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.GROQ_MAX_IN_FLIGHT,
+                        max_keepalive_connections=settings.GROQ_MAX_IN_FLIGHT,
+                        keepalive_expiry=120,
+                    ),
+                    timeout=settings.GROQ_TIMEOUT_SECONDS,
+                ),
+            )
+        return self._client
+
+    async def _create(self, **kwargs):
+        client = self._get_client()
+        estimate = _estimate_tokens(kwargs.get("messages") or [])
+
+        for attempt in range(settings.GROQ_MAX_RETRIES + 1):
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            await self._requests.acquire(1)
+            await self._tokens.acquire(estimate)
+
+            async with self._in_flight:
+                try:
+                    with metrics.timed("llm.request"):
+                        resp = await client.chat.completions.create(**kwargs)
+                except RateLimitError as e:
+                    metrics.incr("llm.rate_limited")
+                    if attempt >= settings.GROQ_MAX_RETRIES:
+                        raise
+                    delay = _retry_after(e, attempt)
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                    continue
+
+            usage = getattr(resp, "usage", None)
+            if usage is not None and getattr(usage, "total_tokens", None):
+                self._tokens.adjust(usage.total_tokens - estimate)
+            return resp
+
+    def chat_completion(self, **kwargs):
+        """Blocking call, usable from the OCR worker's synchronous code."""
+        future = asyncio.run_coroutine_threadsafe(self._create(**kwargs), self._loop)
+        return future.result()
+
+
+_pool: Optional[GroqPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_groq_pool() -> GroqPool:
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = GroqPool()
+        return _pool
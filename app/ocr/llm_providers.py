@@ -0,0 +1,111 @@
+# app/ocr/llm_providers.py
+#
+# Chat-completion backends behind one interface:
+# - "groq": Groq API through the shared, rate-limited GroqPool
+# - "openai_compatible": any OpenAI-style /chat/completions endpoint,
+#   e.g. the local stub (app/ocr/llm_stub.py) for offline load tests
+
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+import requests
+from pydantic import BaseModel
+
+from app.core import metrics
+from app.core.config import settings
+
+
+class LLMResponse(BaseModel):
+    content: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class LLMProvider(ABC):
+    name = "base"
+
+    @abstractmethod
+    def complete(self, model: str, messages: List[dict], temperature: float = 0) -> LLMResponse:
+        """One chat completion; raises on failure after the provider's own retries."""
+
+
+class GroqProvider(LLMProvider):
+    name = "groq"
+
+    def complete(self, model: str, messages: List[dict], temperature: float = 0) -> LLMResponse:
+        from app.ocr.llm_client import get_groq_pool
+
+        resp = get_groq_pool().chat_completion(
+            model=model,
+            temperature=temperature,
+            messages=messages,
+        )
+        usage = getattr(resp, "usage", None)
+        return LLMResponse(
+            content=resp.choices[0].message.content or "",
+            prompt_tokens=getattr(usage, "prompt_tokens", None) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", None) or 0,
+        )
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    name = "openai_compatible"
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.session = requests.Session()  # keep-alive across calls
+        self._in_flight = threading.BoundedSemaphore(settings.GROQ_MAX_IN_FLIGHT)
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+    def complete(self, model: str, messages: List[dict], temperature: float = 0) -> LLMResponse:
+        payload = {"model": model, "temperature": temperature, "messages": messages}
+
+        for attempt in range(settings.GROQ_MAX_RETRIES + 1):
+            with self._in_flight, metrics.timed("llm.request"):
+                resp = self.session.post(
+                    self.url, json=payload, timeout=settings.GROQ_TIMEOUT_SECONDS
+                )
+
+            retryable = resp.status_code == 429 or resp.status_code >= 500
+            if retryable and attempt < settings.GROQ_MAX_RETRIES:
+                if resp.status_code == 429:
+                    metrics.incr("llm.rate_limited")
+                try:
+                    delay = float(resp.headers.get("retry-after"))
+                except (TypeError, ValueError):
+                    delay = min(2 ** attempt, 60) + random.uniform(0, 1)
+                time.sleep(delay)
+                continue
+
+            resp.raise_for_status()
+            data = resp.json()
+            usage = data.get("usage") or {}
+            return LLMResponse(
+                content=data["choices"][0]["message"]["content"] or "",
+                prompt_tokens=usage.get("prompt_tokens") or 0,
+                completion_tokens=usage.get("completion_tokens") or 0,
+            )
+
+
+_provider: Optional[LLMProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_llm_provider() -> LLMProvider:
+    global _provider
+
+    with _provider_lock:
+        if _provider is None:
+            if settings.LLM_PROVIDER == "groq":
+                _provider = GroqProvider()
+            elif settings.LLM_PROVIDER == "openai_compatible":
+                _provider = OpenAICompatibleProvider(
+                    settings.LLM_BASE_URL, settings.LLM_API_KEY
+                )
+            else:
+                raise RuntimeError(f"Unknown LLM_PROVIDER: {settings.LLM_PROVIDER}")
+        return _provider
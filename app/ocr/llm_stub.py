@@ -0,0 +1,111 @@
+# app/ocr/llm_stub.py
+#
+# Offline stand-in for the LLM, OpenAI-compatible (/v1/chat/completions).
+# Used to load-test the OCR workers without network access or quota:
+#
+#   uvicorn app.ocr.llm_stub:app --port 8089
+#   LLM_PROVIDER=openai_compatible LLM_BASE_URL=http://localhost:8089/v1 \
+#       python -m app.ocr.worker
+#
+# Latency and failures are driven by the LLM_STUB_* settings. Answers are
+# built with the rule extractor, so they always validate against LlmReceipt.
+
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.ocr.compaction import estimate_tokens
+from app.ocr.rule_extractor import extract_with_rules, to_ocr_json
+from app.ocr.schemas import LlmReceipt
+
+app = FastAPI(title="LLM stub")
+
+# see the user prompts in app/ocr/groq_llm.py
+BATCH_RE = re.compile(r"tableau JSON de (\d+) objets")
+BLOCK_RE = re.compile(r"^### Justificatif \d+\n", flags=re.MULTILINE)
+HEADER_RE = re.compile(r"^.*?:\n\n", flags=re.S)
+FOOTER_RE = re.compile(r"\n\nInterprète.*$", flags=re.S)
+
+
+def _strip_instructions(text: str) -> str:
+    return FOOTER_RE.sub("", HEADER_RE.sub("", text.strip() + "\n", count=1))
+
+
+def _receipt(ocr_text: str) -> dict:
+    data = to_ocr_json(extract_with_rules(ocr_text))
+    data.pop("source", None)
+    return LlmReceipt.model_validate(data).model_dump()
+
+
+def _answer(user_prompt: str) -> str:
+    m = BATCH_RE.search(user_prompt)
+    if not m:
+        return json.dumps(_receipt(_strip_instructions(user_prompt)), ensure_ascii=False)
+
+    count = int(m.group(1))
+    blocks: List[str] = BLOCK_RE.split(FOOTER_RE.sub("", user_prompt))[1:]
+    blocks += [""] * (count - len(blocks))
+    return json.dumps([_receipt(b) for b in blocks[:count]], ensure_ascii=False)
+
+
+def _error(status: int, message: str, headers=None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": "stub_error"}},
+        headers=headers,
+    )
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(payload: dict):
+    delay = settings.LLM_STUB_LATENCY_MS + random.uniform(
+        -settings.LLM_STUB_JITTER_MS, settings.LLM_STUB_JITTER_MS
+    )
+    await asyncio.sleep(max(delay, 0) / 1000)
+
+    roll = random.random()
+    if roll < settings.LLM_STUB_RATE_LIMIT_RATE:
+        return _error(
+            429,
+            "Rate limit reached (injected)",
+            headers={"retry-after": str(settings.LLM_STUB_RETRY_AFTER_SECONDS)},
+        )
+    if roll < settings.LLM_STUB_RATE_LIMIT_RATE + settings.LLM_STUB_ERROR_RATE:
+        return _error(500, "Internal error (injected)")
+
+    messages = payload.get("messages") or []
+    user_prompt = next(
+        (m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"),
+        "",
+    )
+    content = _answer(user_prompt)
+
+    prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in messages)
+    completion_tokens = estimate_tokens(content)
+
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
@@ -1,64 +1,182 @@
 # app/ocr/paddle.py
 from pathlib import Path
-import tempfile
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union
 
 import fitz  # PyMuPDF
 import cv2
 import numpy as np
-from PIL import Image
-from paddleocr import PaddleOCR
+
+if TYPE_CHECKING:
+    from paddleocr import PaddleOCR
+
+from app.ocr.errors import PermanentOcrError
 
 
 # -------------------------------------------------
 # OCR INIT (same logic as your working project)
 # -------------------------------------------------
 
-def init_ocr(lang: str = "fr") -> PaddleOCR:
+# per-call module switches (PaddleOCR.predict overrides)
+PIPELINE_DEFAULT = {
+    "use_doc_orientation_classify": False,
+    "use_doc_unwarping": False,
+    "use_textline_orientation": True,
+}
+PIPELINE_FAST = {
+    "use_doc_orientation_classify": False,
+    "use_doc_unwarping": False,
+    "use_textline_orientation": False,
+}
+PIPELINE_FULL = {
+    "use_doc_orientation_classify": True,
+    "use_doc_unwarping": True,
+    "use_textline_orientation": True,
+}
+
+
+def init_ocr(lang: str = "fr", tiered: bool = False) -> "PaddleOCR":
+    # paddleocr (+ paddle runtime) is only imported by the process that
+    # actually builds an engine, i.e. the OCR worker
+    from paddleocr import PaddleOCR
+
+    # tiered: also load the orientation / unwarping models so the
+    # escalation pass can switch them on per call
     return PaddleOCR(
         lang=lang,
-        use_doc_orientation_classify=False,
-        use_doc_unwarping=False,
+        use_doc_orientation_classify=tiered,
+        use_doc_unwarping=tiered,
         use_textline_orientation=True,
     )
 
 
 # -------------------------------------------------
-# PDF → IMAGES (same as your project)
+# PDF PAGE → IMAGE (in memory, no temp PNG files)
 # -------------------------------------------------
 
-def pdf_to_images(pdf_path: Path, dpi: int = 250) -> List[Path]:
-    tmp = Path(tempfile.mkdtemp(prefix="receipt_pdf_"))
-    doc = fitz.open(str(pdf_path))
+def pixmap_to_array(pix: "fitz.Pixmap") -> np.ndarray:
+    # wrap the pixmap buffer without copying it (samples_mv on recent PyMuPDF)
+    buf = getattr(pix, "samples_mv", None) or pix.samples
+    rgb = np.frombuffer(buf, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    # PaddleOCR expects BGR; this is the only copy per page and it
+    # detaches the array from the pixmap memory
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+
+def render_page(page: "fitz.Page", dpi: int = 250, max_side: int = None) -> np.ndarray:
+    if max_side:
+        # never render more pixels than OCR will keep after preprocessing
+        longest_pt = max(page.rect.width, page.rect.height)
+        dpi = min(dpi, int(max_side * 72.0 / longest_pt))
     zoom = dpi / 72.0
-    mat = fitz.Matrix(zoom, zoom)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    return pixmap_to_array(pix)
+
+
+# -------------------------------------------------
+# PREPROCESS (grayscale → crop to receipt → downscale)
+# -------------------------------------------------
+
+_ANALYSIS_SIDE = 1200
+
+
+def load_image(img_path: Path) -> np.ndarray:
+    img = cv2.imread(str(img_path), cv2.IMREAD_COLOR)
+    if img is None:
+        raise PermanentOcrError(f"Unreadable image: {img_path}")
+    return img
+
+
+def _analysis_scale(gray: np.ndarray) -> float:
+    return min(1.0, _ANALYSIS_SIDE / max(gray.shape[:2]))
+
+
+def crop_to_receipt(gray: np.ndarray) -> np.ndarray:
+    """Crop to the bounding box of the largest bright contour (the paper)."""
+    k = _analysis_scale(gray)
+    small = cv2.resize(gray, None, fx=k, fy=k, interpolation=cv2.INTER_AREA)
 
-    out_paths: List[Path] = []
-    for i in range(doc.page_count):
-        page = doc.load_page(i)
-        pix = page.get_pixmap(matrix=mat, alpha=False)
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        out = tmp / f"page_{i+1:03d}.png"
-        img.save(out)
-        out_paths.append(out)
+    blur = cv2.GaussianBlur(small, (5, 5), 0)
+    _, mask = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((15, 15), np.uint8))
 
-    return out_paths
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return gray
+
+    x, y, w, h = cv2.boundingRect(max(contours, key=cv2.contourArea))
+    ratio = (w * h) / float(small.shape[0] * small.shape[1])
+    # too small = noise, ~whole frame = nothing to gain
+    if ratio < 0.2 or ratio > 0.95:
+        return gray
+
+    margin = 10
+    x0 = max(int(x / k) - margin, 0)
+    y0 = max(int(y / k) - margin, 0)
+    x1 = min(int((x + w) / k) + margin, gray.shape[1])
+    y1 = min(int((y + h) / k) + margin, gray.shape[0])
+    return gray[y0:y1, x0:x1]
+
+
+def estimate_text_height(gray: np.ndarray) -> float:
+    """Median height (px, full resolution) of glyph-like dark components."""
+    k = _analysis_scale(gray)
+    small = cv2.resize(gray, None, fx=k, fy=k, interpolation=cv2.INTER_AREA)
+
+    _, ink = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    n, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    if n <= 1:
+        return 0.0
+
+    w = stats[1:, cv2.CC_STAT_WIDTH]
+    h = stats[1:, cv2.CC_STAT_HEIGHT]
+    area = stats[1:, cv2.CC_STAT_AREA]
+    glyphs = (h >= 3) & (h <= small.shape[0] * 0.1) & (w <= h * 3) & (area >= 6)
+    if not glyphs.any():
+        return 0.0
+
+    return float(np.median(h[glyphs])) / k
+
+
+def preprocess_image(
+    img: np.ndarray,
+    target_text_height: int = 32,
+    max_side: int = 2500,
+) -> np.ndarray:
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    gray = crop_to_receipt(gray)
+
+    scale = 1.0
+    text_height = estimate_text_height(gray)
+    if text_height > target_text_height:
+        scale = target_text_height / text_height
+    scale = min(scale, max_side / max(gray.shape[:2]))
+
+    # downscale only: upsampling never adds information
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    # PaddleOCR expects 3 channels
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
 
 
 # -------------------------------------------------
 # OCR RUN (ROBUST, VERSION-SAFE)
 # -------------------------------------------------
 
-def run_ocr(ocr: PaddleOCR, img_path: Path) -> str:
+def run_ocr_scored(
+    ocr: "PaddleOCR",
+    img: Union[Path, np.ndarray],
+    pipeline: Dict[str, bool] = PIPELINE_DEFAULT,
+) -> Tuple[str, float]:
+    """OCR text and mean recognition score (0..1, 0 when nothing was read)."""
     result = ocr.predict(
-        str(img_path),
-        use_doc_orientation_classify=False,
-        use_doc_unwarping=False,
-        use_textline_orientation=True,
+        img if isinstance(img, np.ndarray) else str(img),
         return_word_box=False,
+        **pipeline,
     )
 
     lines: List[str] = []
+    scores: List[float] = []
 
     for res in (result or []):
         # EXACT SAME LOGIC AS YOUR WORKING SCRIPT
@@ -68,9 +186,24 @@ def run_ocr(ocr: PaddleOCR, img_path: Path) -> str:
 
         payload = d.get("res", d)
         texts = payload.get("rec_texts") or []
+        rec_scores = payload.get("rec_scores")
+        if rec_scores is None:
+            rec_scores = [None] * len(texts)
 
-        for txt in texts:
+        for txt, score in zip(texts, rec_scores):
             if txt:
                 lines.append(str(txt))
+                if score is not None:
+                    scores.append(float(score))
+
+    confidence = sum(scores) / len(scores) if scores else 0.0
+    return "\n".join(lines).strip(), confidence
+
 
-    return "\n".join(lines).strip()
+def run_ocr(
+    ocr: "PaddleOCR",
+    img: Union[Path, np.ndarray],
+    pipeline: Dict[str, bool] = PIPELINE_DEFAULT,
+) -> str:
+    text, _ = run_ocr_scored(ocr, img, pipeline)
+    return text
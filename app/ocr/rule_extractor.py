@@ -0,0 +1,271 @@
+# app/ocr/rule_extractor.py
+#
+# Deterministic receipt reader for the common cases (one clear total,
+# one currency). Runs in microseconds; the LLM is only called when the
+# confidence returned here is too low.
+
+import re
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.ocr.schemas import ReceiptData
+from app.ocr.totals import AMOUNT_PATTERN
+
+
+class RuleExtraction(BaseModel):
+    data: ReceiptData
+    confidence: float = 0.0
+    expense_category: Optional[str] = None
+
+
+# -------------------------------------------------
+# PATTERNS
+# -------------------------------------------------
+
+AMOUNT_RE = re.compile(r"(?<![\d.,])(" + AMOUNT_PATTERN + r")(?![\d.,]*\d)")
+
+# most specific first: "TOTAL TTC" beats "TOTAL"
+STRONG_TOTAL_RE = re.compile(
+    r"TOTAL\s*TTC|NET\s*[AÀ]\s*PAYER|[AÀ]\s*PAYER|MONTANT\s*(?:TTC|TOTAL|PAY[EÉ])"
+    r"|AMOUNT\s*DUE|GRAND\s*TOTAL|TOTAL\s*DUE",
+    flags=re.IGNORECASE,
+)
+WEAK_TOTAL_RE = re.compile(r"\bTOTAL\b|\bMONTANT\b|\bTTC\b", flags=re.IGNORECASE)
+NOT_TOTAL_RE = re.compile(
+    r"SOUS[\s-]*TOTAL|SUB[\s-]*TOTAL|TOTAL\s*H\.?T|\bHT\b|\bTVA\b|\bVAT\b|RENDU|CHANGE",
+    flags=re.IGNORECASE,
+)
+
+# a strong total line that also mentions VAT / HT / change is trusted less:
+# the LLM gets the final say (below the default OCR_RULES_MIN_CONFIDENCE)
+MIXED_TOTAL_LINE_CONFIDENCE = 0.6
+
+CURRENCY_PATTERNS = [
+    ("EUR", re.compile(r"€|\bEUR\b|\bEUROS?\b", flags=re.IGNORECASE)),
+    ("USD", re.compile(r"US\$|\bUSD\b", flags=re.IGNORECASE)),
+    ("TND", re.compile(r"\bTND\b|\bDT\b|\bDINARS?\b|د\.ت", flags=re.IGNORECASE)),
+    ("INR", re.compile(r"₹|\bINR\b|\bRS\.?\s?\d|\bRUPEES?\b", flags=re.IGNORECASE)),
+    ("CNY", re.compile(r"¥|￥|元|\bCNY\b|\bRMB\b|\bYUAN\b", flags=re.IGNORECASE)),
+    ("KRW", re.compile(r"₩|원|\bKRW\b|\bWON\b", flags=re.IGNORECASE)),
+]
+
+# a bare "$" is also MXN, CAD...: never enough on its own to name a currency
+DOLLAR_SIGN_RE = re.compile(r"(?<!US)\$", flags=re.IGNORECASE)
+AMBIGUOUS_CURRENCY_CONFIDENCE = 0.5
+
+DATE_PATTERNS = [
+    (re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b"), ("y", "m", "d")),
+    (re.compile(r"\b(\d{1,2})[/.\-](\d{1,2})[/.\-](\d{4})\b"), ("d", "m", "y")),
+    (re.compile(r"\b(\d{1,2})[/.\-](\d{1,2})[/.\-](\d{2})\b"), ("d", "m", "y")),
+]
+
+PAYMENT_PATTERNS = [
+    ("Card", re.compile(r"\bCB\b|CARTE|VISA|MASTERCARD|\bAMEX\b|CONTACTLESS|SANS\s*CONTACT|DEBIT|CREDIT", flags=re.IGNORECASE)),
+    ("Cash", re.compile(r"ESP[EÈ]CES|\bCASH\b", flags=re.IGNORECASE)),
+]
+
+# terminal / ticket boilerplate, never a merchant name
+HEADER_NOISE_RE = re.compile(
+    r"APPROUV|ACCEPT|MERCI|TICKET|RE[CÇ]U|CLIENT|TRANSACTION|DUPLICATA|FACTURE",
+    flags=re.IGNORECASE,
+)
+
+# keyword -> EXPENSE_TYPES value
+CATEGORY_PATTERNS = [
+    ("Hotel", re.compile(r"H[OÔ]TEL|NUIT[EÉ]E|FOLIO|CHECK[\s-]*OUT", flags=re.IGNORECASE)),
+    ("Train", re.compile(r"\bSNCF\b|\bTGV\b|\bTRAIN\b|OUIGO|\bTER\b", flags=re.IGNORECASE)),
+    ("Plane", re.compile(r"AIRLINES?|AIR\s*FRANCE|BOARDING|VOL\b|FLIGHT", flags=re.IGNORECASE)),
+    ("Taxi", re.compile(r"\bTAXI\b|\bUBER\b|\bG7\b|\bVTC\b", flags=re.IGNORECASE)),
+    ("Parking", re.compile(r"PARKING|STATIONNEMENT", flags=re.IGNORECASE)),
+    ("Peage", re.compile(r"P[EÉ]AGE|AUTOROUTE|VINCI|SANEF|\bAPRR\b", flags=re.IGNORECASE)),
+    ("Fuel", re.compile(r"CARBURANT|GAZOLE|GASOIL|DIESEL|SP\s?9[58]|ESSENCE|\bFUEL\b", flags=re.IGNORECASE)),
+    ("Food", re.compile(r"RESTAURANT|BRASSERIE|CAF[EÉ]|MENU|BOULANGERIE|\bREPAS\b", flags=re.IGNORECASE)),
+]
+
+
+# -------------------------------------------------
+# HELPERS
+# -------------------------------------------------
+
+def parse_amount(raw: str) -> Optional[float]:
+    """'6,50' -> 6.5, '1 234,56' / '1.234,56' / '1,234.56' -> 1234.56"""
+    s = re.sub(r"\s", "", raw or "")
+    if not s:
+        return None
+
+    last_sep = max(s.rfind(","), s.rfind("."))
+    if last_sep == -1:
+        return float(s) if s.isdigit() else None
+
+    whole = re.sub(r"[.,]", "", s[:last_sep])
+    frac = s[last_sep + 1:]
+    if not (whole.isdigit() or whole == "") or not frac.isdigit():
+        return None
+    return float(f"{whole or '0'}.{frac}")
+
+
+def _amounts(line: str) -> List[float]:
+    out = []
+    for m in AMOUNT_RE.finditer(line):
+        value = parse_amount(m.group(1))
+        if value is not None and value > 0:
+            out.append(value)
+    return out
+
+
+def _find_total(lines: List[str]) -> Tuple[Optional[float], float]:
+    """(total, confidence) from keyword lines, or the single visible amount."""
+    strong, weak = [], []
+    strong_mixed = []  # strong line that also carries VAT / sub-total figures
+
+    for i, line in enumerate(lines):
+        strong_match = STRONG_TOTAL_RE.search(line)
+        not_total = NOT_TOTAL_RE.search(line)
+        if not_total and not strong_match:
+            continue
+
+        match = strong_match or WEAK_TOTAL_RE.search(line)
+        if match is None:
+            continue
+
+        # first amount after the keyword ("TOTAL TTC 88,00 dont TVA 8,00"),
+        # else the first one on the next line (column layouts)
+        values = _amounts(line[match.end():])
+        if not values and i + 1 < len(lines):
+            values = _amounts(lines[i + 1])
+        if not values:
+            continue
+
+        if strong_match:
+            strong.append(values[0])
+            strong_mixed.append(bool(not_total))
+        else:
+            weak.append(values[0])
+
+    # last one wins: totals sit at the bottom, after sub-totals
+    if strong:
+        confidence = 0.95 if len(set(strong)) == 1 else 0.8
+        if strong_mixed[-1]:
+            confidence = min(confidence, MIXED_TOTAL_LINE_CONFIDENCE)
+        return strong[-1], confidence
+    if weak:
+        return weak[-1], 0.75 if len(set(weak)) == 1 else 0.5
+
+    distinct = {v for line in lines for v in _amounts(line)}
+    if len(distinct) == 1:
+        return distinct.pop(), 0.6
+    return None, 0.0
+
+
+def _find_currency(text: str) -> Tuple[Optional[str], float]:
+    counts = Counter()
+    for code, pattern in CURRENCY_PATTERNS:
+        n = len(pattern.findall(text))
+        if n:
+            counts[code] = n
+
+    if not counts:
+        # only "$" signs (or nothing): let the LLM name the currency
+        return None, 0.0
+    (best, n), *others = counts.most_common()
+    if not others:
+        confidence = 1.0
+    else:
+        confidence = 0.5 if n > others[0][1] else 0.0
+
+    if best != "USD" and DOLLAR_SIGN_RE.search(text):
+        confidence = min(confidence, AMBIGUOUS_CURRENCY_CONFIDENCE)
+    return best, confidence
+
+
+def _find_date(text: str) -> Optional[str]:
+    for pattern, order in DATE_PATTERNS:
+        for m in pattern.finditer(text):
+            parts = dict(zip(order, m.groups()))
+            y, mo, d = int(parts["y"]), int(parts["m"]), int(parts["d"])
+            if y < 100:
+                y += 2000
+            if 1 <= mo <= 12 and 1 <= d <= 31 and 2000 <= y <= 2100:
+                return f"{y:04d}-{mo:02d}-{d:02d}"
+    return None
+
+
+def _first_match(text: str, patterns) -> Optional[str]:
+    for label, pattern in patterns:
+        if pattern.search(text):
+            return label
+    return None
+
+
+def _merchant(lines: List[str]) -> Optional[str]:
+    # first line of the header that reads like a name
+    for line in lines[:5]:
+        if (
+            _first_match(line, PAYMENT_PATTERNS)
+            or WEAK_TOTAL_RE.search(line)
+            or HEADER_NOISE_RE.search(line)
+        ):
+            continue
+        letters = sum(c.isalpha() for c in line)
+        if letters >= 3 and letters >= len(line) * 0.5:
+            return line.strip()
+    return None
+
+
+# -------------------------------------------------
+# PUBLIC
+# -------------------------------------------------
+
+def extract_with_rules(ocr_text: str) -> RuleExtraction:
+    lines = [line.strip() for line in (ocr_text or "").splitlines() if line.strip()]
+
+    total, total_conf = _find_total(lines)
+    currency, currency_conf = _find_currency(ocr_text or "")
+
+    data = ReceiptData(
+        merchant_name=_merchant(lines),
+        date=_find_date(ocr_text or ""),
+        currency=currency,
+        total=total,
+        payment_method=_first_match(ocr_text or "", PAYMENT_PATTERNS),
+        confidence_notes=f"rules: total={total_conf:.2f} currency={currency_conf:.2f}",
+    )
+
+    return RuleExtraction(
+        data=data,
+        # both are needed to price the item
+        confidence=min(total_conf, currency_conf),
+        expense_category=_first_match(ocr_text or "", CATEGORY_PATTERNS),
+    )
+
+
+def to_ocr_json(result: RuleExtraction) -> dict:
+    """Same shape as the LLM output (see SYSTEM_PROMPT in groq_llm.py)."""
+    d = result.data
+    level = "high" if result.confidence >= 0.9 else (
+        "medium" if result.confidence >= 0.6 else "low"
+    )
+
+    explanation = None
+    if d.total is not None and d.currency:
+        explanation = (
+            f"Montant total de {d.total:.2f} {d.currency}"
+            + (f" réglé chez {d.merchant_name}" if d.merchant_name else "")
+            + (f" le {d.date}" if d.date else "")
+            + "."
+        )
+
+    return {
+        "document_type": d.document_type,
+        "expense_category": result.expense_category,
+        "merchant_name": d.merchant_name,
+        "date": d.date,
+        "currency": d.currency,
+        "total": d.total,
+        "payment_method": d.payment_method,
+        "explanation": explanation,
+        "confidence_level": level,
+        "source": "rules",
+    }
@@ -1,6 +1,6 @@
 # app/ocr/schemas.py
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Literal, Optional
 
 
 class ReceiptItem(BaseModel):
@@ -30,4 +30,23 @@ class ReceiptData(BaseModel):
     payment_status: Optional[str] = None
 
     confidence_notes: Optional[str] = None
-    raw_notes: Optional[str] = None
\ No newline at end of file
+    raw_notes: Optional[str] = None
+
+
+class LlmReceipt(BaseModel):
+    """Exact JSON schema requested from the LLM (see SYSTEM_PROMPT)."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    document_type: Optional[str] = None
+    expense_category: Optional[str] = None
+    merchant_name: Optional[str] = None
+    date: Optional[str] = None
+
+    currency: Optional[str] = None
+    total: Optional[float] = None
+
+    payment_method: Optional[str] = None
+
+    explanation: Optional[str] = None
+    confidence_level: Literal["high", "medium", "low"]
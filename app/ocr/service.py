@@ -1,39 +1,328 @@
 # app/ocr/service.py
+import random
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from app.ocr.paddle import init_ocr, pdf_to_images, run_ocr
-from app.ocr.groq_llm import parse_receipt_with_llm
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
 
-_ocr_instance = None
+import fitz  # PyMuPDF
+import numpy as np
 
+from app.core import metrics
+from app.core.config import settings
+from app.ocr.engine_pool import OcrEnginePool
+from app.ocr.errors import PermanentOcrError
+from app.ocr.paddle import (
+    PIPELINE_DEFAULT,
+    PIPELINE_FAST,
+    PIPELINE_FULL,
+    init_ocr,
+    load_image,
+    preprocess_image,
+    render_page,
+    run_ocr_scored,
+)
+from app.ocr.groq_llm import parse_receipt_with_llm, parse_receipts_with_llm_batch
+from app.ocr.rule_extractor import RuleExtraction, extract_with_rules, to_ocr_json
+from app.ocr.totals import has_total
 
-def extract_receipt(file_path: str) -> dict:
-    global _ocr_instance
+_engine_pool = None
+_page_pool = None
+_pools_lock = threading.Lock()
 
-    path = Path(file_path)
-    if not path.exists():
-        raise FileNotFoundError(file_path)
 
-    if _ocr_instance is None:
-        _ocr_instance = init_ocr(lang="fr")
+def _new_engine():
+    return init_ocr(lang=settings.OCR_LANG, tiered=settings.OCR_TIERED)
+
+
+def get_engine_pool() -> OcrEnginePool:
+    global _engine_pool
+
+    with _pools_lock:
+        if _engine_pool is None:
+            _engine_pool = OcrEnginePool(
+                _new_engine,
+                size=settings.OCR_ENGINE_POOL_SIZE,
+                max_jobs=settings.OCR_ENGINE_MAX_JOBS,
+            )
+        return _engine_pool
+
+
+def warm_up():
+    get_engine_pool().warm_up()
+
+
+def _get_page_pool() -> ThreadPoolExecutor:
+    global _page_pool
+
+    with _pools_lock:
+        if _page_pool is None:
+            _page_pool = ThreadPoolExecutor(
+                max_workers=max(settings.OCR_PAGE_PARALLELISM, 1),
+                thread_name_prefix="ocr-page",
+            )
+        return _page_pool
+
+
+def _prepare(img):
+    if not settings.OCR_PREPROCESS:
+        return img
+
+    if not isinstance(img, np.ndarray):
+        img = load_image(img)
+
+    with metrics.timed("ocr.preprocess"):
+        out = preprocess_image(
+            img,
+            target_text_height=settings.OCR_TARGET_TEXT_HEIGHT,
+            max_side=settings.OCR_MAX_IMAGE_SIDE,
+        )
+    metrics.incr("ocr.preprocess.pixels_in", img.shape[0] * img.shape[1])
+    metrics.incr("ocr.preprocess.pixels_out", out.shape[0] * out.shape[1])
+    return out
+
+
+class _Page(NamedTuple):
+    index: int
+    text: str
+    confidence: Optional[float]  # None: read from the PDF text layer
+
+
+def _ocr_page(img, pipeline: Dict[str, bool], timer: str) -> Tuple[str, float]:
+    img = _prepare(img)
+    with get_engine_pool().checkout() as ocr, metrics.timed(timer):
+        return run_ocr_scored(ocr, img, pipeline)
+
+
+def _has_text_layer(text: str) -> bool:
+    return sum(c.isalnum() for c in text) >= settings.OCR_PDF_TEXT_MIN_CHARS
+
+
+def _pdf_pages(
+    path: Path,
+    pipeline: Dict[str, bool],
+    timer: str,
+    only: Optional[Set[int]] = None,
+) -> List[_Page]:
+    """
+    Pages of a PDF, in page order (all of them, or the indexes in `only`).
+
+    Pages are rendered on this thread (PyMuPDF is not thread-safe) and
+    OCR'd on the page pool; at most OCR_PAGE_PARALLELISM rendered pages
+    exist at any time, which bounds peak memory for long documents.
+    """
+    parallelism = max(settings.OCR_PAGE_PARALLELISM, 1)
+    pool = _get_page_pool()
+
+    pages: List[_Page] = []
+    pending = deque()  # (index, page text or OCR future), in page order
+    total_found = False
+
+    def collect_oldest():
+        nonlocal total_found
+        index, item = pending.popleft()
+        if isinstance(item, Future):
+            page = _Page(index, *item.result())
+        else:
+            page = _Page(index, item, None)
+        pages.append(page)
+        if settings.OCR_PDF_EARLY_EXIT and has_total(page.text):
+            total_found = True
+
+    with fitz.open(str(path)) as doc:
+        if only is None and doc.page_count > settings.OCR_PDF_MAX_PAGES:
+            metrics.incr("ocr.pdf.truncated")
+
+        for index in range(min(doc.page_count, settings.OCR_PDF_MAX_PAGES)):
+            if only is not None and index not in only:
+                continue
+            if total_found:
+                metrics.incr("ocr.pdf.early_exit")
+                break
+
+            page = doc.load_page(index)
+
+            # born-digital pages: the embedded text is exact and ~free
+            t = page.get_text("text").strip()
+            if _has_text_layer(t):
+                metrics.incr("ocr.pdf_page.text_layer")
+                pending.append((index, t))
+            else:
+                while sum(isinstance(p, Future) for _, p in pending) >= parallelism:
+                    collect_oldest()
+                if total_found:
+                    metrics.incr("ocr.pdf.early_exit")
+                    break
+
+                metrics.incr("ocr.pdf_page.ocr")
+                img = render_page(
+                    page,
+                    dpi=settings.OCR_PDF_DPI,
+                    max_side=settings.OCR_MAX_IMAGE_SIDE,
+                )
+                pending.append((index, pool.submit(_ocr_page, img, pipeline, timer)))
+
+            # consume whatever is already available, in order
+            while pending and (
+                not isinstance(pending[0][1], Future) or pending[0][1].done()
+            ):
+                collect_oldest()
+
+    while pending:
+        collect_oldest()
 
-    texts = []
+    return pages
 
+
+def _read_pages(
+    path: Path,
+    pipeline: Dict[str, bool],
+    timer: str,
+    only: Optional[Set[int]] = None,
+) -> List[_Page]:
     if path.suffix.lower() == ".pdf":
-        pages = pdf_to_images(path)
-        for p in pages:
-            t = run_ocr(_ocr_instance, p)
-            if t:
-                texts.append(t)
+        return _pdf_pages(path, pipeline, timer, only)
+    return [_Page(0, *_ocr_page(path, pipeline, timer))]
+
+
+def _ocr_confidence(pages: List[_Page]) -> Optional[float]:
+    """Mean recognition score of the OCR'd pages, weighted by their text length."""
+    read = [(p.confidence, len(p.text)) for p in pages if p.confidence is not None]
+    chars = sum(n for _, n in read)
+    if not chars:
+        return None
+    return sum(c * n for c, n in read) / chars
+
+
+def _better(second: _Page, first: _Page) -> bool:
+    # a found total beats confidence; confidence only decides between
+    # readings that agree on whether there is a total
+    found, found2 = has_total(first.text), has_total(second.text)
+    return (found2 and not found) or (found2 == found and second.confidence > first.confidence)
+
+
+def _escalate(path: Path, pages: List[_Page]) -> List[_Page]:
+    """
+    Second pass (orientation + unwarping) when the fast pass of the whole
+    document found no total on any page or read it with low confidence.
+
+    Decided per document: terms-and-conditions or folio detail pages
+    without a total do not escalate a PDF whose total is on another page.
+    """
+    threshold = settings.OCR_ESCALATE_MIN_CONFIDENCE
+    ocr_pages = [p for p in pages if p.confidence is not None]
+    if not ocr_pages:
+        return pages  # text layer only
+
+    found = any(has_total(p.text) for p in pages)
+    confidence = _ocr_confidence(pages)
+    if found and (confidence is None or confidence >= threshold):
+        metrics.incr("ocr.tier1.accepted")
+        return pages
+
+    # no total: it may be on any OCR'd page; weak read: redo the weak pages
+    redo = {p.index for p in ocr_pages if not found or p.confidence < threshold}
+    metrics.incr("ocr.tier2.escalated")
+    metrics.incr("ocr.tier2.pages", len(redo))
+
+    second = {p.index: p for p in _read_pages(path, PIPELINE_FULL, "ocr.tier2", redo)}
+    merged = []
+    for page in pages:
+        again = second.get(page.index)
+        if again is not None and _better(again, page):
+            metrics.incr("ocr.tier2.improved")
+            page = again
+        merged.append(page)
+    return merged
+
+
+def _record_agreement(rules: RuleExtraction, llm: dict):
+    for field in ("total", "currency"):
+        ours = getattr(rules.data, field)
+        theirs = llm.get(field)
+        if ours is None or theirs is None:
+            continue
+        if field == "total":
+            try:
+                same = abs(float(ours) - float(theirs)) < 0.005
+            except (TypeError, ValueError):
+                same = False
+        else:
+            same = str(ours).upper() == str(theirs).strip().upper()
+        metrics.incr(f"rules.{field}.{'agree' if same else 'disagree'}")
+
+
+def interpret_receipt(ocr_text: str) -> dict:
+    """Rule-based extraction first; the LLM only when it is not confident."""
+    if not settings.OCR_RULES_ENABLED:
+        return parse_receipt_with_llm(ocr_text)
+
+    with metrics.timed("rules.extract"):
+        rules = extract_with_rules(ocr_text)
+
+    if rules.confidence >= settings.OCR_RULES_MIN_CONFIDENCE:
+        metrics.incr("rules.hit")
+        if random.random() < settings.OCR_RULES_SHADOW_RATE:
+            try:
+                _record_agreement(rules, parse_receipt_with_llm(ocr_text))
+            except Exception as e:
+                print("[RULES SHADOW ERROR]", repr(e))
+        return to_ocr_json(rules)
+
+    metrics.incr("rules.fallback")
+    parsed = parse_receipt_with_llm(ocr_text)
+    _record_agreement(rules, parsed)
+    return parsed
+
+
+def interpret_receipts(ocr_texts: List[str]) -> List[Optional[dict]]:
+    """
+    Batch version of interpret_receipt: low-confidence texts share LLM calls.
+    None for a text the LLM could not interpret.
+    """
+    results: List[Optional[dict]] = [None] * len(ocr_texts)
+    rules_by_index = {}
+
+    for i, text in enumerate(ocr_texts):
+        if not settings.OCR_RULES_ENABLED:
+            continue
+        rules = extract_with_rules(text)
+        if rules.confidence >= settings.OCR_RULES_MIN_CONFIDENCE:
+            metrics.incr("rules.hit")
+            results[i] = to_ocr_json(rules)
+        else:
+            metrics.incr("rules.fallback")
+            rules_by_index[i] = rules
+
+    todo = [i for i, r in enumerate(results) if r is None]
+    for i, parsed in zip(todo, parse_receipts_with_llm_batch([ocr_texts[i] for i in todo])):
+        if parsed is not None and i in rules_by_index:
+            _record_agreement(rules_by_index[i], parsed)
+        results[i] = parsed
+
+    return results
+
+
+def extract_text(file_path: str) -> str:
+    path = Path(file_path)
+    if not path.exists():
+        raise FileNotFoundError(file_path)
+
+    if settings.OCR_TIERED:
+        pages = _escalate(path, _read_pages(path, PIPELINE_FAST, "ocr.tier1"))
     else:
-        t = run_ocr(_ocr_instance, path)
-        if t:
-            texts.append(t)
+        pages = _read_pages(path, PIPELINE_DEFAULT, "ocr.inference")
 
-    ocr_text = "\n\n".join(texts).strip()
+    ocr_text = "\n\n".join(p.text for p in pages if p.text).strip()
     if not ocr_text:
-        raise RuntimeError("OCR produced empty text")
+        raise PermanentOcrError("OCR produced empty text")
+    return ocr_text
 
-    parsed = parse_receipt_with_llm(ocr_text)
+
+def extract_receipt(file_path: str) -> dict:
+    ocr_text = extract_text(file_path)
+    parsed = interpret_receipt(ocr_text)
 
     return {
         "ocr_text": ocr_text,
@@ -0,0 +1,28 @@
+# app/ocr/totals.py
+import re
+
+# an amount such as 6,50 / 1 234.00 / 12.5
+AMOUNT_PATTERN = r"\d{1,3}(?:[ .\u00a0]?\d{3})*[.,]\d{1,2}"
+
+TOTAL_KEYWORDS = (
+    "TOTAL",
+    "TTC",
+    "MONTANT",
+    "NET A PAYER",
+    "NET À PAYER",
+    "A PAYER",
+    "À PAYER",
+    "AMOUNT DUE",
+    "GRAND TOTAL",
+)
+
+TOTAL_LINE_RE = re.compile(
+    r"(?:" + "|".join(re.escape(k) for k in TOTAL_KEYWORDS) + r")"
+    r"[^\n\d]{0,40}?(" + AMOUNT_PATTERN + r")",
+    flags=re.IGNORECASE,
+)
+
+
+def has_total(text: str) -> bool:
+    """True if the text contains a TOTAL/TTC/MONTANT keyword followed by an amount."""
+    return bool(text) and TOTAL_LINE_RE.search(text) is not None
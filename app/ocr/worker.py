@@ -0,0 +1,250 @@
+# app/ocr/worker.py
+#
+# Standalone OCR worker:
+#     python -m app.ocr.worker
+#
+# Starts OCR_WORKER_PROCESSES processes that pull jobs from the ocr_jobs
+# table and write results back to Attachment. The parent process restarts
+# dead children, runs the stale-job sweeper, refreshes FX rates and
+# repairs report totals that drifted from their items.
+
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models import user  # noqa: F401  (relationship target, no API imports here)
+from app.models.attachment import Attachment
+from app.ocr.errors import PermanentOcrError
+from app.ocr.jobs import (
+    claim_next_job,
+    heartbeat_job,
+    mark_job_done,
+    mark_job_failed,
+    requeue_stale_jobs,
+)
+from app.services.fx_loader import start_fx_refresher, stop_fx_refresher
+from app.services.ocr_result_service import (
+    apply_ocr_amount,
+    find_cached_result,
+    store_ocr_result,
+)
+from app.utils.calculations import repair_report_totals
+
+
+# -------------------------------------------------------------------
+# OCR TASK (runs inside a worker process)
+# Raises on failure: retry / final FAILED is decided by the job queue.
+# -------------------------------------------------------------------
+
+def run_ocr_task(attachment_id: str):
+    from app.ocr.service import extract_receipt
+
+    db: Session = SessionLocal()
+
+    try:
+        attachment = db.query(Attachment).filter_by(id=attachment_id).first()
+        if not attachment:
+            return
+
+        if attachment.ocr_status == "DONE" and attachment.ocr_json:
+            # earlier attempt stored the OCR but failed on FX: only redo that
+            apply_ocr_amount(db, attachment, attachment.ocr_json)
+            return
+
+        attachment.ocr_status = "PROCESSING"
+        attachment.ocr_error = None
+        attachment.ocr_text = None
+        attachment.ocr_json = None
+        db.commit()
+
+        # identical file already processed -> skip PaddleOCR + LLM
+        result = find_cached_result(db, attachment.content_sha256)
+        if result is None:
+            result = extract_receipt(attachment.file_path)
+        if not result or not result.get("ocr_text"):
+            raise PermanentOcrError("OCR returned empty text")
+
+        store_ocr_result(db, attachment, result)
+
+        # ---- APPLY AMOUNT + FX
+        apply_ocr_amount(db, attachment, result["ocr_json"])
+
+    finally:
+        db.close()
+
+
+# -------------------------------------------------------------------
+# WORKER PROCESS
+# -------------------------------------------------------------------
+
+_stopping = False
+
+
+def _request_stop(signum, frame):
+    global _stopping
+    _stopping = True
+
+
+def _init_worker_process():
+    # each process loads its own pool of PaddleOCR engines up front
+    from app.ocr.service import warm_up
+
+    warm_up()
+
+
+def _heartbeat(job_id: str, worker_id: str, stop: threading.Event):
+    # keeps locked_at fresh so the sweeper does not requeue a slow job
+    while not stop.wait(settings.OCR_JOB_HEARTBEAT_SECONDS):
+        db: Session = SessionLocal()
+        try:
+            if not heartbeat_job(db, job_id, worker_id):
+                return
+        except Exception as e:
+            print("[OCR HEARTBEAT ERROR]", job_id, repr(e))
+        finally:
+            db.close()
+
+
+def process_one_job(worker_id: str) -> bool:
+    db: Session = SessionLocal()
+    try:
+        claimed = claim_next_job(db, worker_id)
+        if not claimed:
+            return False
+
+        job_id, attachment_id = claimed
+        stop_heartbeat = threading.Event()
+        threading.Thread(
+            target=_heartbeat,
+            args=(job_id, worker_id, stop_heartbeat),
+            name="ocr-heartbeat",
+            daemon=True,
+        ).start()
+
+        try:
+            run_ocr_task(attachment_id)
+        except Exception as e:
+            print("[OCR FAILED]", attachment_id, repr(e))
+            db.rollback()
+            recorded = mark_job_failed(db, job_id, worker_id, e)
+        else:
+            recorded = mark_job_done(db, job_id, worker_id)
+        finally:
+            stop_heartbeat.set()
+
+        if not recorded:
+            print("[OCR JOB] reclaimed by another worker, outcome not recorded:", job_id)
+        return True
+    finally:
+        db.close()
+
+
+def worker_loop():
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    _init_worker_process()
+    print(f"[OCR WORKER] {worker_id} ready")
+
+    # counters live in this process only: log them, nothing else can read them
+    metrics_tag = f"OCR METRICS {worker_id}"
+    next_metrics_log = time.monotonic() + settings.OCR_METRICS_LOG_INTERVAL_SECONDS
+
+    while not _stopping:
+        if time.monotonic() >= next_metrics_log:
+            metrics.log_snapshot(metrics_tag)
+            next_metrics_log = time.monotonic() + settings.OCR_METRICS_LOG_INTERVAL_SECONDS
+        try:
+            if process_one_job(worker_id):
+                continue
+        except Exception as e:
+            # DB hiccup: keep the worker alive
+            print("[OCR WORKER ERROR]", repr(e))
+        time.sleep(settings.OCR_WORKER_POLL_SECONDS)
+
+    metrics.log_snapshot(metrics_tag)
+
+
+# -------------------------------------------------------------------
+# SUPERVISOR
+# -------------------------------------------------------------------
+
+def _sweep():
+    db: Session = SessionLocal()
+    try:
+        recovered = requeue_stale_jobs(db)
+        if recovered:
+            print(f"[OCR SWEEPER] requeued {recovered} job(s)")
+    except Exception as e:
+        print("[OCR SWEEPER ERROR]", repr(e))
+    finally:
+        db.close()
+
+
+def _check_report_totals():
+    db: Session = SessionLocal()
+    try:
+        repaired = repair_report_totals(db)
+        db.commit()
+        if repaired:
+            print(f"[REPORT TOTALS] repaired {repaired} drifted total(s)")
+    except Exception as e:
+        print("[REPORT TOTALS ERROR]", repr(e))
+    finally:
+        db.close()
+
+
+def main():
+    signal.signal(signal.SIGTERM, _request_stop)
+    signal.signal(signal.SIGINT, _request_stop)
+
+    # spawn: Paddle is not fork-safe and must not inherit a DB pool
+    ctx = multiprocessing.get_context("spawn")
+    processes = []
+
+    def start_process():
+        p = ctx.Process(target=worker_loop, daemon=True)
+        p.start()
+        return p
+
+    for _ in range(settings.OCR_WORKER_PROCESSES):
+        processes.append(start_process())
+
+    start_fx_refresher()
+
+    next_sweep = 0.0
+    next_totals_check = 0.0
+    while not _stopping:
+        now = time.monotonic()
+        if now >= next_sweep:
+            _sweep()
+            next_sweep = now + settings.OCR_SWEEP_INTERVAL_SECONDS
+        if now >= next_totals_check:
+            _check_report_totals()
+            next_totals_check = now + settings.REPORT_TOTALS_CHECK_INTERVAL_SECONDS
+
+        for i, p in enumerate(processes):
+            if not p.is_alive():
+                print(f"[OCR WORKER] pid={p.pid} exited ({p.exitcode}), restarting")
+                processes[i] = start_process()
+
+        time.sleep(1)
+
+    stop_fx_refresher()
+    for p in processes:
+        p.terminate()
+    for p in processes:
+        p.join(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -54,7 +54,7 @@ class ExpenseReportUpdate(BaseModel):
         return self
 
 
-class ExpenseReportOut(BaseModel):
+class ExpenseReportSummary(BaseModel):
     id: UUID
     user_id: UUID
     concerned_person: str
@@ -69,7 +69,10 @@ class ExpenseReportOut(BaseModel):
     decision_at: Optional[datetime]
     decision_comment: Optional[str]
     created_at: datetime
-    items: List[ExpenseItemResponse] = []
 
     class Config:
         from_attributes = True
+
+
+class ExpenseReportOut(ExpenseReportSummary):
+    items: List[ExpenseItemResponse] = []
@@ -2,6 +2,7 @@ from datetime import date
 from typing import Optional
 from fastapi import HTTPException
 
+from app.core.currencies import normalize_currency
 from app.services.currency_service import convert_to_eur
 
 
@@ -15,16 +16,18 @@ def resolve_amount(
         return None
 
     try:
-        eur, rate = convert_to_eur(amount, currency, conversion_date)
+        eur, rate, rate_date = convert_to_eur(amount, currency, conversion_date)
     except ValueError as e:
         # ❌ never crash submit
         raise HTTPException(status_code=400, detail=str(e))
 
     return {
         "amount": amount,
-        "currency": currency.upper(),
+        "currency": normalize_currency(currency),
         "amount_eur": eur,
         "exchange_rate": rate,
-        "exchange_rate_date": conversion_date,
+        # the rates used: an earlier date (or the snapshot's) when
+        # conversion_date has none of its own
+        "exchange_rate_date": rate_date,
         "amount_source": source,
     }
@@ -1,42 +1,251 @@
 # app/services/currency_service.py
-import requests
+#
+# EUR conversion from the fx_rates table (filled by app.services.fx_loader).
+# Rates of a date are read once per process and kept in memory, so a
+# conversion is a dict lookup and never waits on the FX API.
+#
+# Stale entries are served while a background thread re-reads them
+# (stale-while-revalidate); with an empty table the last refreshed snapshot
+# (FX_SNAPSHOT_PATH) or the bundled one (FX_SNAPSHOT_SEED_PATH) is used.
+
+import json
+import os
+import threading
+import time
 from datetime import date
-from functools import lru_cache
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.currencies import CANONICAL_CURRENCIES, normalize_currency
+from app.db.session import SessionLocal
+from app.models.fx_rate import FxRate
 
 FX_URL = "https://open.er-api.com/v6/latest/EUR"
 
-SUPPORTED = {"EUR", "USD", "TND", "CNY", "KRW", "INR"}
+SUPPORTED = set(CANONICAL_CURRENCIES)
+
+# conversion date -> (rates, date the rates were published for, loaded at)
+_rates_cache: Dict[date, Tuple[Dict[str, float], date, float]] = {}
+_rates_lock = threading.Lock()
+_revalidating = set()
+
+
+def _load_rates(conversion_date: date) -> Tuple[Dict[str, float], Optional[date]]:
+    """Rates of the closest published date on or before conversion_date."""
+    db = SessionLocal()
+    try:
+        rate_date = (
+            db.query(func.max(FxRate.date))
+            .filter(FxRate.date <= conversion_date)
+            .scalar()
+        )
+        if rate_date is None:
+            # older than the history: the first known rates are the best guess
+            rate_date = db.query(func.min(FxRate.date)).scalar()
+        if rate_date is None:
+            return {}, None
+
+        rows = (
+            db.query(FxRate.currency, FxRate.rate)
+            .filter(FxRate.date == rate_date)
+            .all()
+        )
+        return {currency: float(rate) for currency, rate in rows}, rate_date
+    finally:
+        db.close()
+
+
+def _is_fresh(conversion_date: date, rate_date: date, loaded_at: float) -> bool:
+    # past dates with their own rates never change; anything else (today,
+    # gaps filled from an earlier date) may be superseded by a later load
+    if rate_date == conversion_date and conversion_date < date.today():
+        return True
+    return time.monotonic() - loaded_at < settings.FX_CACHE_TTL_SECONDS
+
+
+def load_snapshot() -> Tuple[Dict[str, float], Optional[date]]:
+    """Last refreshed snapshot, else the one bundled with the code."""
+    for path in (settings.FX_SNAPSHOT_PATH, settings.FX_SNAPSHOT_SEED_PATH):
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            return (
+                {k: float(v) for k, v in data["rates"].items()},
+                date.fromisoformat(data["date"]),
+            )
+        except (OSError, ValueError, KeyError) as e:
+            print("[FX SNAPSHOT ERROR]", path, repr(e))
+    return {}, None
+
+
+def _fetch(conversion_date: date) -> Tuple[Dict[str, float], date]:
+    rates, rate_date = _load_rates(conversion_date)
+    if rate_date is None:
+        metrics.incr("fx.snapshot_fallback")
+        rates, rate_date = load_snapshot()
+    if rate_date is None:
+        raise RuntimeError("No FX rates loaded (run python -m app.services.fx_loader)")
+    return rates, rate_date
+
+
+def _put(conversion_date: date, rates: Dict[str, float], rate_date: date):
+    # entries are replaced whole, never mutated: readers see old or new rates
+    with _rates_lock:
+        _rates_cache[conversion_date] = (rates, rate_date, time.monotonic())
+
+
+def _revalidate(conversion_date: date):
+    try:
+        _put(conversion_date, *_fetch(conversion_date))
+        metrics.incr("fx.revalidated")
+    except Exception as e:
+        print("[FX REVALIDATE FAILED]", repr(e))
+    finally:
+        with _rates_lock:
+            _revalidating.discard(conversion_date)
+
+
+def get_rates(conversion_date: date) -> Tuple[Dict[str, float], date]:
+    """(rates, date the rates were published for): an earlier date or the
+    snapshot's when conversion_date has no rates of its own."""
+    revalidate = False
+    with _rates_lock:
+        cached = _rates_cache.get(conversion_date)
+        if cached and not _is_fresh(conversion_date, cached[1], cached[2]):
+            revalidate = conversion_date not in _revalidating
+            _revalidating.add(conversion_date)
 
+    if cached:
+        if revalidate:
+            threading.Thread(
+                target=_revalidate, args=(conversion_date,), name="fx-revalidate", daemon=True
+            ).start()
+        return cached[0], cached[1]
 
-@lru_cache(maxsize=1)
-def _get_rates():
-    resp = requests.get(FX_URL, timeout=10)
-    resp.raise_for_status()
-    data = resp.json()
+    rates, rate_date = _fetch(conversion_date)
+    _put(conversion_date, rates, rate_date)
+    return rates, rate_date
 
-    if data.get("result") != "success":
-        raise RuntimeError("FX API error")
 
-    return data["rates"]
+def expire_rate_cache():
+    """New rates were stored: re-read every date on its next use (in the background)."""
+    with _rates_lock:
+        for key, (rates, rate_date, _) in list(_rates_cache.items()):
+            _rates_cache[key] = (rates, rate_date, float("-inf"))
 
 
+# -------------------------------------------------
+# ROUNDING (half-up on the decimal values, like accounting)
+# -------------------------------------------------
+
+def _div_half_up(num, den, decimals: int) -> float:
+    q = Decimal(str(num)) / Decimal(str(den))
+    return float(q.quantize(Decimal(1).scaleb(-decimals), rounding=ROUND_HALF_UP))
+
+
+def _div_half_up_many(num, den, decimals: int):
+    """Vectorized _div_half_up: float fast path, Decimal only for near-ties."""
+    import numpy as np
+
+    scale = 10.0 ** decimals
+    q = num / den
+    scaled = np.abs(q) * scale
+    out = np.floor(scaled + 0.5)
+
+    # float noise can put an exact .5 tie on the wrong side (1.005 * 100)
+    frac = scaled - np.floor(scaled)
+    near_tie = np.abs(frac - 0.5) < 1e-9 * np.maximum(scaled, 1.0)
+    for i in np.flatnonzero(near_tie):
+        out[i] = round(abs(_div_half_up(num[i], den[i], decimals)) * scale)
+
+    return np.sign(q) * out / scale + 0.0
+
+
+# -------------------------------------------------
+# CONVERSION
+# -------------------------------------------------
+
 def convert_to_eur(amount: float, currency: str, conversion_date: date):
-    currency = currency.upper()
+    """(amount_eur, eur_rate, date of the rates actually used)."""
+    code = normalize_currency(currency)
 
-    if currency not in SUPPORTED:
+    if code not in SUPPORTED:
         raise ValueError(f"Unsupported currency: {currency}")
+    currency = code
 
-    rates = _get_rates()
-
+    conversion_date = conversion_date or date.today()
     if currency == "EUR":
-        return round(amount, 2), 1.0
+        return _div_half_up(amount, 1, 2), 1.0, conversion_date
+
+    rates, rate_date = get_rates(conversion_date)
 
     if currency not in rates:
         raise ValueError(f"No FX rate for {currency}")
 
     rate = rates[currency]
 
-    eur_amount = round(amount / rate, 2)
-    eur_rate = round(1 / rate, 6)
+    eur_amount = _div_half_up(amount, rate, 2)
+    eur_rate = _div_half_up(1, rate, 6)
+
+    return eur_amount, eur_rate, rate_date
+
+
+def convert_many_to_eur(
+    amounts: Sequence[float],
+    currencies: Sequence[str],
+    conversion_dates: Sequence[date],
+):
+    """
+    Bulk convert_to_eur: returns (amounts_eur, eur_rates, rate_dates) as
+    NumPy arrays; rate_dates holds the date of the rates actually used.
+
+    Rates are looked up once per distinct (date, currency); the division
+    and rounding run over whole arrays. Results match convert_to_eur.
+    """
+    import numpy as np
+
+    values = np.asarray(amounts, dtype=np.float64)
+    raw_codes = np.asarray(currencies, dtype=str)
+    days = np.asarray(conversion_dates, dtype="datetime64[D]")
+    if not (len(values) == len(raw_codes) == len(days)):
+        raise ValueError("amounts, currencies and conversion_dates differ in length")
+
+    # normalize each distinct spelling once, not each item
+    code_list, code_index = np.unique(raw_codes, return_inverse=True)
+    canonical = [normalize_currency(c) for c in code_list.tolist()]
+    unsupported = [raw for raw, code in zip(code_list.tolist(), canonical) if code not in SUPPORTED]
+    if unsupported:
+        raise ValueError(f"Unsupported currency: {', '.join(sorted(unsupported))}")
+    code_list = canonical
+
+    # one integer per (date, currency): the distinct pairs come from np.unique
+    pair_keys = days.astype(np.int64) * len(code_list) + code_index.reshape(-1)
+    unique_keys, inverse = np.unique(pair_keys, return_inverse=True)
+
+    unit_rates = np.ones(len(unique_keys))
+    unit_dates = np.empty(len(unique_keys), dtype="datetime64[D]")
+    for n, key in enumerate(unique_keys.tolist()):
+        day_number, code_number = divmod(key, len(code_list))
+        currency = code_list[code_number]
+        unit_dates[n] = np.datetime64(day_number, "D")
+        if currency == "EUR":
+            continue
+        rates, rate_date = get_rates(unit_dates[n].astype(date))
+        if currency not in rates:
+            raise ValueError(f"No FX rate for {currency}")
+        unit_rates[n] = rates[currency]
+        unit_dates[n] = np.datetime64(rate_date, "D")
 
-    return eur_amount, eur_rate
+    inverse = inverse.reshape(-1)
+    per_item = unit_rates[inverse]
+    return (
+        _div_half_up_many(values, per_item, 2),
+        _div_half_up_many(np.ones_like(per_item), per_item, 6),
+        unit_dates[inverse],
+    )
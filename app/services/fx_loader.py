@@ -0,0 +1,231 @@
+# app/services/fx_loader.py
+#
+# Fills the fx_rates table read by currency_service:
+#     python -m app.services.fx_loader                  # latest rates from the FX API
+#     python -m app.services.fx_loader --file rates.json --date 2024-03-01
+#
+# --file takes the FX API response format ({"rates": {"USD": 1.08, ...}}),
+# which allows back-filling past dates or loading rates offline.
+#
+# FxRefresher does the same on a schedule, in a daemon thread of the API
+# and of the OCR worker supervisor, and keeps the runtime snapshot
+# (FX_SNAPSHOT_PATH) current. The bundled app/data/fx_snapshot.json is
+# only ever read.
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+import requests
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.fx_rate import FxRate
+from app.services.currency_service import (
+    FX_URL,
+    SUPPORTED,
+    expire_rate_cache,
+    load_snapshot,
+)
+
+# one keep-alive connection for every refresh of this process
+_session = requests.Session()
+
+
+def parse_rates(data: dict) -> Tuple[date, Dict[str, float]]:
+    if data.get("result", "success") != "success":
+        raise RuntimeError("FX API error")
+
+    published = data.get("time_last_update_unix")
+    rate_date = (
+        datetime.utcfromtimestamp(published).date() if published else date.today()
+    )
+    return rate_date, data["rates"]
+
+
+def fetch_latest_rates() -> Tuple[date, Dict[str, float]]:
+    resp = _session.get(FX_URL, timeout=10)
+    resp.raise_for_status()
+    return parse_rates(resp.json())
+
+
+def store_rates(
+    db: Session,
+    rate_date: date,
+    rates: Dict[str, float],
+    source: Optional[str] = None,
+) -> int:
+    now = datetime.utcnow()
+    rows = [
+        {
+            "date": rate_date,
+            "currency": currency,
+            "rate": 1.0 if currency == "EUR" else rates[currency],
+            "source": source,
+            "fetched_at": now,
+        }
+        for currency in sorted(SUPPORTED)
+        if currency == "EUR" or rates.get(currency)
+    ]
+    if not rows:
+        return 0
+
+    stmt = insert(FxRate).values(rows)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[FxRate.date, FxRate.currency],
+            set_={
+                "rate": stmt.excluded.rate,
+                "source": stmt.excluded.source,
+                "fetched_at": stmt.excluded.fetched_at,
+            },
+        )
+    )
+    db.commit()
+
+    # other processes pick the new rates up after FX_CACHE_TTL_SECONDS
+    expire_rate_cache()
+    return len(rows)
+
+
+def write_snapshot(rate_date: date, rates: Dict[str, float], path: Optional[str] = None):
+    path = path or settings.FX_SNAPSHOT_PATH
+    data = {
+        "date": rate_date.isoformat(),
+        "base": "EUR",
+        "rates": {
+            c: 1.0 if c == "EUR" else rates[c]
+            for c in sorted(SUPPORTED)
+            if c == "EUR" or rates.get(c)
+        },
+    }
+
+    # private temp file + rename: a reader never sees a half-written file,
+    # and concurrent writers (API workers, OCR supervisor) never share one
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".fx_snapshot.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def seed_from_snapshot(db: Session) -> int:
+    """Empty table (new database): start from the bundled snapshot."""
+    if db.query(func.count(FxRate.date)).scalar():
+        return 0
+
+    rates, rate_date = load_snapshot()
+    if rate_date is None:
+        return 0
+    return store_rates(db, rate_date, rates, source="snapshot")
+
+
+def refresh_rates() -> bool:
+    try:
+        rate_date, rates = fetch_latest_rates()
+    except Exception as e:
+        metrics.incr("fx.refresh.failed")
+        print("[FX REFRESH FAILED]", repr(e))
+        return False
+
+    db = SessionLocal()
+    try:
+        store_rates(db, rate_date, rates, source=FX_URL)
+    finally:
+        db.close()
+    metrics.incr("fx.refresh.ok")
+
+    try:
+        write_snapshot(rate_date, rates)
+    except OSError as e:
+        print("[FX SNAPSHOT ERROR]", repr(e))
+    return True
+
+
+class FxRefresher:
+    def __init__(self, interval_seconds: float):
+        self.interval = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="fx-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        db = SessionLocal()
+        try:
+            seed_from_snapshot(db)
+        except Exception as e:
+            print("[FX SEED FAILED]", repr(e))
+        finally:
+            db.close()
+
+        while not self._stop.is_set():
+            try:
+                refresh_rates()
+            except Exception as e:
+                print("[FX REFRESH FAILED]", repr(e))
+            self._stop.wait(self.interval)
+
+
+_refresher: Optional[FxRefresher] = None
+
+
+def start_fx_refresher():
+    global _refresher
+
+    if settings.FX_REFRESH_ENABLED and _refresher is None:
+        _refresher = FxRefresher(settings.FX_REFRESH_INTERVAL_SECONDS)
+        _refresher.start()
+
+
+def stop_fx_refresher():
+    if _refresher is not None:
+        _refresher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load FX rates into fx_rates")
+    parser.add_argument("--file", help="JSON file in the FX API format")
+    parser.add_argument("--date", type=date.fromisoformat, help="override the rate date")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            rate_date, rates = parse_rates(json.load(f))
+        source = args.file
+    else:
+        rate_date, rates = fetch_latest_rates()
+        source = FX_URL
+
+    rate_date = args.date or rate_date
+
+    db = SessionLocal()
+    try:
+        count = store_rates(db, rate_date, rates, source=source)
+    finally:
+        db.close()
+
+    print(f"[FX] {count} rates stored for {rate_date}")
+
+
+if __name__ == "__main__":
+    main()
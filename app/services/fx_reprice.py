@@ -0,0 +1,111 @@
+# app/services/fx_reprice.py
+#
+# Re-price the items of draft reports with the current FX rates:
+#     python -m app.services.fx_reprice                  # every draft
+#     python -m app.services.fx_reprice --report <id>    # one draft report
+#
+# Conversion runs once over all items (convert_many_to_eur); the new
+# amount_eur / exchange_rate / exchange_rate_date values are written back
+# with UPDATE ... FROM (VALUES ...), and report totals are recomputed in
+# the same transaction.
+# Submitted and decided reports are never touched.
+
+import argparse
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import Date, Numeric, column, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+
+from app.core.currencies import normalize_currency
+from app.db.session import SessionLocal
+from app.models import attachment, user  # noqa: F401  (relationship targets)
+from app.models.expense_item import ExpenseItem
+from app.models.expense_report import ExpenseReport, ExpenseReportStatus
+from app.services.currency_service import SUPPORTED, convert_many_to_eur
+from app.utils.calculations import repair_report_totals
+
+UPDATE_CHUNK_SIZE = 10000
+
+
+def reprice_drafts(
+    db: Session,
+    conversion_date: Optional[date] = None,
+    report_id=None,
+) -> int:
+    conversion_date = conversion_date or date.today()
+
+    query = (
+        db.query(ExpenseItem.id, ExpenseItem.report_id, ExpenseItem.amount, ExpenseItem.currency)
+        .join(ExpenseReport, ExpenseReport.id == ExpenseItem.report_id)
+        .filter(
+            ExpenseReport.status == ExpenseReportStatus.draft,
+            ExpenseItem.amount.isnot(None),
+            ExpenseItem.currency.isnot(None),
+        )
+    )
+    if report_id is not None:
+        query = query.filter(ExpenseItem.report_id == report_id)
+
+    rows = [r for r in query.all() if normalize_currency(r.currency) in SUPPORTED]
+    if not rows:
+        return 0
+
+    amounts_eur, eur_rates, rate_dates = convert_many_to_eur(
+        [r.amount for r in rows],
+        [r.currency for r in rows],
+        [conversion_date] * len(rows),
+    )
+
+    priced = list(zip(
+        [r.id for r in rows],
+        amounts_eur.tolist(),
+        eur_rates.tolist(),
+        rate_dates.tolist(),  # datetime64[D] -> date
+    ))
+
+    # one statement per chunk keeps the VALUES list (and its parameters) bounded
+    for start in range(0, len(priced), UPDATE_CHUNK_SIZE):
+        new_prices = values(
+            column("id", UUID(as_uuid=True)),
+            column("amount_eur", Numeric(10, 2)),
+            column("exchange_rate", Numeric(12, 6)),
+            column("exchange_rate_date", Date),
+            name="new_prices",
+        ).data(priced[start:start + UPDATE_CHUNK_SIZE])
+
+        db.execute(
+            update(ExpenseItem)
+            .where(ExpenseItem.id == new_prices.c.id)
+            .values(
+                amount_eur=new_prices.c.amount_eur,
+                exchange_rate=new_prices.c.exchange_rate,
+                exchange_rate_date=new_prices.c.exchange_rate_date,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    repair_report_totals(db, {r.report_id for r in rows})
+
+    db.commit()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-price draft expense items")
+    parser.add_argument("--report", help="only this report (must be a draft)")
+    parser.add_argument("--date", type=date.fromisoformat, help="conversion date (default: today)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        count = reprice_drafts(db, conversion_date=args.date, report_id=args.report)
+    finally:
+        db.close()
+
+    print(f"[FX REPRICE] {count} item(s) re-priced")
+
+
+if __name__ == "__main__":
+    main()
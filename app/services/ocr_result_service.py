@@ -0,0 +1,91 @@
+# app/services/ocr_result_service.py
+from datetime import date
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.currencies import normalize_currency
+from app.models.attachment import Attachment
+from app.models.expense_item import ExpenseItem
+from app.ocr.ui_summary import build_ui_summary
+from app.services.amount_service import resolve_amount
+from app.utils.calculations import apply_report_total_delta
+
+
+def find_cached_result(db: Session, content_sha256: str) -> Optional[dict]:
+    """Completed OCR of an identical file (same SHA-256), if any."""
+    if not content_sha256:
+        return None
+
+    query = db.query(Attachment.ocr_text, Attachment.ocr_json).filter(
+        Attachment.content_sha256 == content_sha256,
+        Attachment.ocr_status == "DONE",
+        Attachment.ocr_text.isnot(None),
+        Attachment.ocr_json.isnot(None),
+    )
+    row = query.first()
+    if not row:
+        metrics.incr("ocr_cache.miss")
+        return None
+
+    metrics.incr("ocr_cache.hit")
+    ocr_json = {k: v for k, v in row.ocr_json.items() if k != "ui_summary"}
+    return {"ocr_text": row.ocr_text, "ocr_json": ocr_json}
+
+
+def store_ocr_result(db: Session, attachment: Attachment, result: dict):
+    # ---- OCR RAW DATA
+    attachment.ocr_text = result["ocr_text"]
+
+    # ---- CANONICAL CURRENCY ("€", "Dinars"... -> ISO code)
+    ocr_json = dict(result["ocr_json"])
+    if ocr_json.get("currency"):
+        ocr_json["currency"] = normalize_currency(ocr_json["currency"]) or ocr_json["currency"]
+
+    # ---- BUILD UI SUMMARY
+    ui_summary = build_ui_summary(ocr_json)
+
+    # ---- STORE FULL OCR JSON
+    attachment.ocr_json = {
+        **ocr_json,
+        "ui_summary": ui_summary,
+    }
+    attachment.ocr_status = "DONE"
+    attachment.ocr_error = None
+    db.commit()
+
+
+def apply_ocr_amount(db: Session, attachment: Attachment, ocr: dict):
+    item = db.query(ExpenseItem).filter_by(
+        id=attachment.expense_item_id
+    ).first()
+
+    if not item:
+        return
+
+    currency = normalize_currency(ocr.get("currency"))
+    if ocr.get("currency") and currency is None:
+        # retrying cannot help: leave the amount to the user
+        print("[OCR] unknown currency", repr(ocr.get("currency")), attachment.id)
+        return
+
+    if ocr.get("total") and currency:
+        old_amount_eur = item.amount_eur
+        item.amount = float(ocr["total"])
+        item.currency = currency
+
+        resolved = resolve_amount(
+            amount=item.amount,
+            currency=item.currency,
+            source="ocr",
+            conversion_date=date.today(),
+        )
+
+        item.amount_eur = resolved["amount_eur"]
+        item.exchange_rate = resolved["exchange_rate"]
+        item.exchange_rate_date = resolved["exchange_rate_date"]
+        item.amount_source = "ocr"
+
+        apply_report_total_delta(db, item.report_id, old_amount_eur, item.amount_eur)
+        db.commit()
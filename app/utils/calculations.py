@@ -1,16 +1,51 @@
+from decimal import Decimal
+from typing import Iterable, Optional
+
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from app.models.expense_item import ExpenseItem
 from app.models.expense_report import ExpenseReport
 
 
-def recalculate_report_total_eur(db: Session, report_id):
-    total = (
-        db.query(func.coalesce(func.sum(ExpenseItem.amount_eur), 0))
-        .filter(ExpenseItem.report_id == report_id)
-        .scalar()
+def _eur(value) -> Decimal:
+    return Decimal(str(value)) if value is not None else Decimal("0")
+
+
+def apply_report_total_delta(db: Session, report_id, old_amount_eur, new_amount_eur):
+    """
+    Move the report total by (new - old) inside the caller's transaction.
+
+    A single UPDATE ... SET total = total + delta: concurrent edits of the
+    same report add up instead of overwriting each other. Caller commits.
+    """
+    delta = _eur(new_amount_eur) - _eur(old_amount_eur)
+    if not delta:
+        return
+
+    db.query(ExpenseReport).filter(ExpenseReport.id == report_id).update(
+        {
+            ExpenseReport.total_amount_eur:
+                func.coalesce(ExpenseReport.total_amount_eur, 0) + delta
+        },
+        synchronize_session=False,
     )
 
-    report = db.query(ExpenseReport).filter_by(id=report_id).first()
-    report.total_amount_eur = total
-    db.commit()
+
+def repair_report_totals(db: Session, report_ids: Optional[Iterable] = None) -> int:
+    """Reset totals that drifted from SUM(items.amount_eur). Caller commits."""
+    items_total = (
+        select(func.coalesce(func.sum(ExpenseItem.amount_eur), 0))
+        .where(ExpenseItem.report_id == ExpenseReport.id)
+        .scalar_subquery()
+    )
+
+    query = db.query(ExpenseReport).filter(
+        ExpenseReport.total_amount_eur.is_distinct_from(items_total)
+    )
+    if report_ids is not None:
+        query = query.filter(ExpenseReport.id.in_(list(report_ids)))
+
+    return query.update(
+        {ExpenseReport.total_amount_eur: items_total},
+        synchronize_session=False,
+    )
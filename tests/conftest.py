@@ -0,0 +1,12 @@
+# tests/conftest.py
+#
+# app.core.config reads the DB settings at import time; the engine is
+# created lazily, so placeholder values are enough for tests that do not
+# talk to Postgres.
+import os
+
+os.environ.setdefault("DB_HOST", "localhost")
+os.environ.setdefault("DB_PORT", "5432")
+os.environ.setdefault("DB_NAME", "expense_test")
+os.environ.setdefault("DB_USER", "expense")
+os.environ.setdefault("DB_PASSWORD", "expense")
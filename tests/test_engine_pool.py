@@ -0,0 +1,63 @@
+# tests/test_engine_pool.py
+import threading
+
+import pytest
+
+from app.ocr.engine_pool import OcrEnginePool
+
+
+class FlakyFactory:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.built = 0
+
+    def __call__(self):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("model download failed")
+        self.built += 1
+        return object()
+
+
+def _checkout_in_thread(pool: OcrEnginePool) -> bool:
+    done = threading.Event()
+
+    def run():
+        with pool.checkout():
+            done.set()
+
+    threading.Thread(target=run, daemon=True).start()
+    return done.wait(timeout=2)
+
+
+def test_failed_warm_up_keeps_capacity():
+    factory = FlakyFactory(failures=1)
+    pool = OcrEnginePool(factory, size=2)
+
+    with pytest.raises(RuntimeError):
+        pool.warm_up()
+
+    # nothing was built, so both slots are still free
+    with pool.checkout():
+        assert _checkout_in_thread(pool)
+    assert factory.built == 2
+
+
+def test_warm_up_fills_the_pool_once():
+    factory = FlakyFactory(failures=0)
+    pool = OcrEnginePool(factory, size=3)
+
+    pool.warm_up()
+    pool.warm_up()
+
+    assert factory.built == 3
+
+
+def test_failed_lazy_create_frees_its_slot():
+    pool = OcrEnginePool(FlakyFactory(failures=1), size=1)
+
+    with pytest.raises(RuntimeError):
+        with pool.checkout():
+            pass
+
+    assert _checkout_in_thread(pool)
@@ -0,0 +1,222 @@
+# tests/test_guards.py
+#
+# Each guard resolves ownership and report status with exactly one query,
+# and none at all for a malformed id.
+import uuid
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.guards import (
+    attachment_access,
+    item_access,
+    owned_item,
+    owned_report,
+    token_attachment,
+)
+from app.db.base import Base
+from app.models import fx_rate, llm_cache, ocr_job  # noqa: F401  (register tables)
+from app.models.attachment import Attachment
+from app.models.expense_item import ExpenseItem
+from app.models.expense_report import ExpenseReport, ExpenseReportStatus
+from app.models.user import User
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def data(engine):
+    db = sessionmaker(bind=engine)()
+    owner = User(id=uuid.uuid4(), email="owner@x", name="Owner", password_hash="x", role="EMPLOYEE")
+    other = User(id=uuid.uuid4(), email="other@x", name="Other", password_hash="x", role="EMPLOYEE")
+    report = ExpenseReport(
+        id=uuid.uuid4(),
+        user_id=owner.id,
+        concerned_person="Owner",
+        hierarchical_plant="plant",
+        plant_department="dept",
+        date_start=date(2026, 1, 1),
+        date_end=date(2026, 1, 31),
+        status=ExpenseReportStatus.pending,
+        approval_token="token-1",
+    )
+    item = ExpenseItem(
+        id=uuid.uuid4(),
+        report_id=report.id,
+        topic="Taxi",
+        type="Taxi",
+        payment_type="Card",
+        date=date(2026, 1, 2),
+    )
+    attachment = Attachment(
+        id=uuid.uuid4(),
+        expense_item_id=item.id,
+        filename="r.png",
+        content_type="image/png",
+        file_path="uploads/r.png",
+        ocr_status="DONE",
+    )
+    other_report = ExpenseReport(
+        id=uuid.uuid4(),
+        user_id=other.id,
+        concerned_person="Other",
+        hierarchical_plant="plant",
+        plant_department="dept",
+        date_start=date(2026, 1, 1),
+        date_end=date(2026, 1, 31),
+        status=ExpenseReportStatus.pending,
+        approval_token="token-2",
+    )
+    other_item = ExpenseItem(
+        id=uuid.uuid4(),
+        report_id=other_report.id,
+        topic="Hotel",
+        type="Hotel",
+        payment_type="Card",
+        date=date(2026, 1, 3),
+    )
+    other_attachment = Attachment(
+        id=uuid.uuid4(),
+        expense_item_id=other_item.id,
+        filename="h.pdf",
+        content_type="application/pdf",
+        file_path="uploads/h.pdf",
+    )
+    db.add_all([
+        owner, other, report, item, attachment,
+        other_report, other_item, other_attachment,
+    ])
+    db.commit()
+
+    ids = {
+        "owner": User(id=owner.id),
+        "other": User(id=other.id),
+        "report": report.id,
+        "item": item.id,
+        "attachment": attachment.id,
+        "other_attachment": other_attachment.id,
+    }
+    db.close()
+    return ids
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+GUARDS = {
+    "report": owned_report,
+    "item": owned_item,
+    "item_access": item_access,
+    "attachment": attachment_access,
+}
+TARGET = {"report": "report", "item": "item", "item_access": "item", "attachment": "attachment"}
+
+
+@pytest.mark.parametrize("guard", sorted(GUARDS))
+def test_owner_is_resolved_in_one_query(db, data, queries, guard):
+    row = GUARDS[guard](db, str(data[TARGET[guard]]), data["owner"])
+
+    assert row is not None
+    assert len(queries) == 1, queries
+
+
+@pytest.mark.parametrize("guard", sorted(GUARDS))
+def test_foreign_owner_is_403_in_one_query(db, data, queries, guard):
+    with pytest.raises(HTTPException) as exc:
+        GUARDS[guard](db, str(data[TARGET[guard]]), data["other"])
+
+    assert exc.value.status_code == 403
+    assert len(queries) == 1, queries
+
+
+@pytest.mark.parametrize("guard", sorted(GUARDS))
+def test_missing_row_is_404_in_one_query(db, data, queries, guard):
+    with pytest.raises(HTTPException) as exc:
+        GUARDS[guard](db, str(uuid.uuid4()), data["owner"])
+
+    assert exc.value.status_code == 404
+    assert len(queries) == 1, queries
+
+
+@pytest.mark.parametrize("guard", sorted(GUARDS))
+def test_malformed_id_is_404_without_query(db, data, queries, guard):
+    with pytest.raises(HTTPException) as exc:
+        GUARDS[guard](db, "not-a-uuid", data["owner"])
+
+    assert exc.value.status_code == 404
+    assert queries == []
+
+
+@pytest.mark.parametrize("guard", sorted(GUARDS))
+def test_locked_report_is_403_in_one_query(db, data, queries, guard):
+    with pytest.raises(HTTPException) as exc:
+        GUARDS[guard](db, str(data[TARGET[guard]]), data["owner"], locked="locked")
+
+    assert exc.value.status_code == 403
+    assert exc.value.detail == "locked"
+    assert len(queries) == 1, queries
+
+
+def test_extra_columns_come_from_the_same_query(db, data, queries):
+    row = attachment_access(
+        db, str(data["attachment"]), data["owner"], Attachment.ocr_status, Attachment.filename
+    )
+
+    assert (row.item_id, row.report_id) == (data["item"], data["report"])
+    assert (row.ocr_status, row.filename) == ("DONE", "r.png")
+    assert len(queries) == 1, queries
+
+
+def test_token_attachment_in_one_query(db, data, queries):
+    row = token_attachment(db, "token-1", str(data["attachment"]), Attachment.file_path)
+
+    assert (row.report_id, row.file_path) == (data["report"], "uploads/r.png")
+    assert len(queries) == 1, queries
+
+
+@pytest.mark.parametrize(
+    "token, attachment, detail",
+    [
+        ("unknown", "attachment", "Invalid or expired link"),
+        ("token-1", "other_attachment", "Attachment not found"),
+        ("token-1", None, "Attachment not found"),
+    ],
+)
+def test_token_attachment_is_404_in_one_query(db, data, queries, token, attachment, detail):
+    attachment_id = data[attachment] if attachment else uuid.uuid4()
+    with pytest.raises(HTTPException) as exc:
+        token_attachment(db, token, str(attachment_id))
+
+    assert (exc.value.status_code, exc.value.detail) == (404, detail)
+    assert len(queries) == 1, queries
+
+
+def test_token_attachment_malformed_id_is_404_without_query(db, data, queries):
+    with pytest.raises(HTTPException) as exc:
+        token_attachment(db, "token-1", "not-a-uuid")
+
+    assert exc.value.status_code == 404
+    assert queries == []
@@ -0,0 +1,32 @@
+# tests/test_startup_imports.py
+#
+# The API process must start without the OCR stack: PaddleOCR, OpenCV,
+# PyMuPDF, NumPy and the Groq client are only loaded by the OCR worker.
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+HEAVY_MODULES = ["paddleocr", "paddle", "cv2", "fitz", "numpy", "groq"]
+
+
+def test_api_import_does_not_load_ocr_stack():
+    code = (
+        "import sys\n"
+        "import app.main\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=dict(os.environ),
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+
+    assert result.returncode == 0, result.stderr
+    loaded = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    assert loaded == "", f"loaded at API startup: {loaded}"